@@ -1,3 +1,4 @@
+import asyncio
 import os
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
@@ -6,7 +7,18 @@ from contextlib import asynccontextmanager
 
 from api.routers.presentation.router import presentation_router
 from api.services.database import sql_engine
+from api.services.llm_response_cache import (
+    LLM_CACHE_BYPASS_HEADER,
+    llm_response_cache_bypass,
+)
+from api.services.instances import (
+    documents_process_pool,
+    export_worker_pool,
+    llm_client_registry,
+    pictures_process_pool,
+)
 from api.utils import update_env_with_user_config
+from image_processor.icons_vectorstore_utils import load_icons_index
 
 can_change_keys = os.getenv("CAN_CHANGE_KEYS") != "false"
 
@@ -15,7 +27,18 @@ can_change_keys = os.getenv("CAN_CHANGE_KEYS") != "false"
 async def lifespan(_: FastAPI):
     os.makedirs(os.getenv("APP_DATA_DIRECTORY"), exist_ok=True)
     SQLModel.metadata.create_all(sql_engine)
+    await asyncio.to_thread(pictures_process_pool.start)
+    await asyncio.to_thread(documents_process_pool.start)
+    try:
+        await asyncio.to_thread(load_icons_index)
+    except Exception as e:
+        # ? Icons index is loaded again on first icon request
+        print(f"Could not load icons index: {e}")
     yield
+    export_worker_pool.shutdown()
+    await llm_client_registry.aclose()
+    pictures_process_pool.shutdown()
+    documents_process_pool.shutdown()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -36,4 +59,12 @@ async def update_env_middleware(request: Request, call_next):
     return await call_next(request)
 
 
+@app.middleware("http")
+async def llm_cache_bypass_middleware(request: Request, call_next):
+    llm_response_cache_bypass.set(
+        request.headers.get(LLM_CACHE_BYPASS_HEADER) == "bypass"
+    )
+    return await call_next(request)
+
+
 app.include_router(presentation_router)
@@ -1,5 +1,5 @@
 import json
-from typing import Optional
+from typing import Literal, Optional
 from pydantic import BaseModel
 
 from api.sql_models import PresentationSqlModel
@@ -47,6 +47,19 @@ class SSEStatusResponse(BaseModel):
         ).to_string()
 
 
+class SSEAssetResponse(BaseModel):
+    slide: int
+    kind: Literal["image", "icon"]
+    index: int
+    path: str
+
+    def to_string(self):
+        return SSEResponse(
+            event="response",
+            data=json.dumps({"type": "asset", **self.model_dump()}),
+        ).to_string()
+
+
 class SSECompleteResponse(BaseModel):
     key: str
     value: object
@@ -6,7 +6,7 @@ from api.routers.presentation.models import (
     DecomposeDocumentsRequest,
     DecomposeDocumentsResponse,
 )
-from api.services.instances import temp_file_service
+from api.services.instances import documents_process_pool, temp_file_service
 from api.services.logging import LoggingService
 from document_processor.loader import DocumentsLoader
 
@@ -28,8 +28,13 @@ class DecomposeDocumentsHandler:
             extra=log_metadata.model_dump(),
         )
 
-        documents_loader = DocumentsLoader(self.documents)
+        documents_loader = DocumentsLoader(self.documents, documents_process_pool)
         await documents_loader.load_documents(self.temp_dir)
+
+        logging_service.logger.info(
+            logging_service.message({"load_times": documents_loader.load_times}),
+            extra=log_metadata.model_dump(),
+        )
         parsed_documents = documents_loader.documents
 
         document_paths = []
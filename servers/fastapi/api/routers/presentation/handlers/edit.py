@@ -11,9 +11,9 @@ from api.routers.presentation.models import (
 from api.services.instances import temp_file_service
 from api.services.logging import LoggingService
 from api.utils import get_presentation_dir, get_presentation_images_dir
-from image_processor.icons_vectorstore_utils import get_icons_vectorstore
+from document_processor.chunks_index import search_document_chunks
 from image_processor.images_finder import generate_image
-from image_processor.icons_finder import get_icon
+from image_processor.icons_finder import get_icons_for_queries
 from ppt_generator.models.other_models import SlideType
 from ppt_generator.models.query_and_prompt_models import (
     IconQueryCollectionWithData,
@@ -65,12 +65,20 @@ class PresentationEditHandler:
             (await get_slide_type_from_prompt(self.prompt, slide_to_edit)).slide_type
         )
 
+        # ? Edits are grounded on document chunks relevant to prompt and slide
+        document_excerpts = await asyncio.to_thread(
+            search_document_chunks,
+            self.presentation_id,
+            [f"{self.prompt}\n{slide_to_edit.content.title}"],
+        )
+
         edited_content = await get_edited_slide_content_model(
             self.prompt,
             new_slide_type,
             slide_to_edit,
             presentation.theme,
             presentation.language,
+            document_excerpts[0] if document_excerpts else None,
         )
 
         new_slide_model = SlideModel(
@@ -146,19 +154,14 @@ class PresentationEditHandler:
                 icons_to_generate.append(each)
 
         images_directory = get_presentation_images_dir(self.presentation_id)
-        if icons_to_generate:
-            icons_vectorstore = get_icons_vectorstore()
 
         coroutines = [
             generate_image(each_prompt, images_directory)
             for each_prompt in images_to_generate
-        ] + [
-            get_icon(icons_vectorstore, each_query) for each_query in icons_to_generate
         ]
-        generated_assets = await asyncio.gather(*coroutines)
-        generated_image_count = len(images_to_generate)
-        generate_images = generated_assets[:generated_image_count]
-        generate_icons = generated_assets[generated_image_count:]
+        generate_icons, *generate_images = await asyncio.gather(
+            get_icons_for_queries(icons_to_generate), *coroutines
+        )
 
         for each in new_slide_images:
             if isinstance(new_slide_images[each], ImagePromptWithThemeAndAspectRatio):
@@ -1,5 +1,14 @@
+import asyncio
+import hashlib
+import json
 import os
+from tempfile import SpooledTemporaryFile
+from typing import IO, Optional, Union
+from urllib.parse import quote
 import uuid
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session
 from api.models import LogMetadata
 from api.routers.presentation.mixins.fetch_presentation_assets import (
     FetchPresentationAssetsMixin,
@@ -8,12 +17,24 @@ from api.routers.presentation.models import (
     ExportAsRequest,
     PresentationAndPath,
 )
+from api.services.file_cache import get_file_hash
 from api.services.logging import LoggingService
-from api.services.instances import temp_file_service
-from api.sql_models import PresentationSqlModel
+from api.services.instances import (
+    export_worker_pool,
+    pictures_process_pool,
+    processed_pictures_cache,
+    slides_cache,
+    temp_file_service,
+)
+from api.sql_models import KeyValueSqlModel, PresentationSqlModel
 from api.utils import get_presentation_dir, sanitize_filename
 from ppt_generator.pptx_presentation_creator import PptxPresentationCreator
 from api.services.database import get_sql_session
+from ppt_generator.models.pptx_models import PptxPictureBoxModel
+
+DOWNLOAD_COMPRESSION_LEVEL = 6
+DOWNLOAD_SPOOL_MAX_SIZE = 32 * 1024 * 1024
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
 
 
 class ExportAsPptxHandler(FetchPresentationAssetsMixin):
@@ -35,30 +56,43 @@ class ExportAsPptxHandler(FetchPresentationAssetsMixin):
             extra=log_metadata.model_dump(),
         )
 
-        await self.fetch_presentation_assets()
-
         with get_sql_session() as sql_session:
             presentation = sql_session.get(
                 PresentationSqlModel, self.data.presentation_id
             )
 
         ppt_path = os.path.join(
-            self.presentation_dir,
-            sanitize_filename(f"{presentation.title}.pptx")
+            self.presentation_dir, sanitize_filename(f"{presentation.title}.pptx")
         )
-        ppt_creator = PptxPresentationCreator(self.data.pptx_model, self.temp_dir)
-        ppt_creator.create_ppt()
-        ppt_creator.save(ppt_path)
-
         response = PresentationAndPath(
             presentation_id=self.data.presentation_id, path=ppt_path
         )
 
+        # ? Same export request returns the previously exported file
+        export_hash = await asyncio.to_thread(self.get_export_hash)
+        if export_hash and self.is_already_exported(
+            export_hash, ppt_path, presentation
+        ):
+            logging_service.logger.info(
+                logging_service.message(response.model_dump(mode="json")),
+                extra=log_metadata.model_dump(),
+            )
+            return response
+
+        await self.fetch_presentation_assets()
+
+        # ? Export is CPU bound, so it runs in worker pool to keep event loop free
+        await export_worker_pool.run(
+            self.create_pptx, ppt_path, self.data.compression_level
+        )
+
         with get_sql_session() as sql_session:
             presentation = sql_session.get(
                 PresentationSqlModel, self.data.presentation_id
             )
             presentation.file = ppt_path
+            if export_hash:
+                self.save_export_hash(sql_session, export_hash, ppt_path)
             sql_session.commit()
 
         logging_service.logger.info(
@@ -67,3 +101,139 @@ class ExportAsPptxHandler(FetchPresentationAssetsMixin):
         )
 
         return response
+
+    async def download(
+        self, logging_service: LoggingService, log_metadata: LogMetadata
+    ):
+        logging_service.logger.info(
+            logging_service.message(self.data.model_dump(mode="json")),
+            extra=log_metadata.model_dump(),
+        )
+
+        with get_sql_session() as sql_session:
+            presentation = sql_session.get(
+                PresentationSqlModel, self.data.presentation_id
+            )
+        if not presentation:
+            raise HTTPException(404, "Presentation not found")
+
+        await self.fetch_presentation_assets()
+
+        # ? Presentation is streamed from memory, spilling to disk only when large
+        pptx_file = SpooledTemporaryFile(max_size=DOWNLOAD_SPOOL_MAX_SIZE)
+        try:
+            await export_worker_pool.run(
+                self.create_pptx,
+                pptx_file,
+                (
+                    DOWNLOAD_COMPRESSION_LEVEL
+                    if self.data.compression_level is None
+                    else self.data.compression_level
+                ),
+            )
+        except:
+            pptx_file.close()
+            raise
+        content_length = pptx_file.tell()
+        pptx_file.seek(0)
+
+        file_name = sanitize_filename(f"{presentation.title}.pptx")
+        logging_service.logger.info(
+            logging_service.message({"file_name": file_name, "size": content_length}),
+            extra=log_metadata.model_dump(),
+        )
+
+        return StreamingResponse(
+            self.iterate_file(pptx_file),
+            media_type="application/vnd.openxmlformats-officedocument.presentationml.presentation",
+            headers={
+                "Content-Length": str(content_length),
+                "Content-Disposition": f"attachment; filename*=UTF-8''{quote(file_name)}",
+            },
+        )
+
+    def iterate_file(self, file: IO[bytes]):
+        try:
+            while chunk := file.read(DOWNLOAD_CHUNK_SIZE):
+                yield chunk
+        finally:
+            file.close()
+
+    def get_export_hash(self) -> Optional[str]:
+        assets = []
+        for each_slide in self.data.pptx_model.slides:
+            for each_shape in each_slide.shapes:
+                if isinstance(each_shape, PptxPictureBoxModel):
+                    image_path = self.get_local_image_path(each_shape.picture.path)
+                    if image_path is None:
+                        # ? Remote images are identified by their url
+                        assets.append(each_shape.picture.path)
+                        continue
+                    try:
+                        assets.append(get_file_hash(image_path))
+                    except OSError:
+                        return None
+
+        key = json.dumps(
+            [
+                self.data.model_dump(mode="json", exclude={"presentation_id"}),
+                assets,
+            ]
+        )
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def get_export_hash_id(self) -> str:
+        return f"pptx_export_{self.data.presentation_id}"
+
+    def is_already_exported(
+        self, export_hash: str, ppt_path: str, presentation: PresentationSqlModel
+    ) -> bool:
+        with get_sql_session() as sql_session:
+            key_value_model = sql_session.get(
+                KeyValueSqlModel, self.get_export_hash_id()
+            )
+
+        if not (key_value_model and key_value_model.value):
+            return False
+        value = key_value_model.value
+        try:
+            mtime = os.path.getmtime(ppt_path)
+        except OSError:
+            return False
+        return (
+            presentation.file == ppt_path
+            and value.get("hash") == export_hash
+            and value.get("file") == ppt_path
+            and value.get("mtime") == mtime
+        )
+
+    def save_export_hash(self, sql_session: Session, export_hash: str, ppt_path: str):
+        value = {
+            "hash": export_hash,
+            "file": ppt_path,
+            "mtime": os.path.getmtime(ppt_path),
+        }
+        key_value_model = sql_session.get(KeyValueSqlModel, self.get_export_hash_id())
+        if key_value_model:
+            key_value_model.value = value
+        else:
+            sql_session.add(
+                KeyValueSqlModel(
+                    id=self.get_export_hash_id(), key="pptx_export", value=value
+                )
+            )
+
+    def create_pptx(
+        self, file: Union[str, IO[bytes]], compression_level: Optional[int] = None
+    ):
+        ppt_creator = PptxPresentationCreator(
+            self.data.pptx_model,
+            self.temp_dir,
+            pictures_cache=processed_pictures_cache,
+            pictures_process_pool=pictures_process_pool,
+            target_dpi=self.data.target_dpi,
+            jpeg_quality=self.data.jpeg_quality,
+            slides_cache=slides_cache,
+        )
+        ppt_creator.create_ppt()
+        ppt_creator.save(file, compression_level)
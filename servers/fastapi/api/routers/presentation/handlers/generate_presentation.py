@@ -1,3 +1,4 @@
+import asyncio
 from typing import List
 import uuid, aiohttp
 from api.models import LogMetadata
@@ -13,10 +14,14 @@ from api.routers.presentation.models import (
     PresentationPathAndEditPath,
 )
 from api.services.database import get_sql_session
-from api.services.instances import temp_file_service
+from api.services.instances import documents_process_pool, temp_file_service
 from api.services.logging import LoggingService
 from api.sql_models import PresentationSqlModel, SlideSqlModel
 from api.utils import get_presentation_dir
+from document_processor.chunks_index import (
+    build_chunks_index,
+    search_document_chunks,
+)
 from document_processor.loader import DocumentsLoader
 from ppt_config_generator.document_summary_generator import generate_document_summary
 from ppt_config_generator.ppt_outlines_generator import generate_ppt_content
@@ -51,12 +56,26 @@ class GeneratePresentationHandler(FetchAssetsOnPresentationGenerationMixin):
 
         summary = None
         if documents_and_images_path.documents:
-            documents_loader = DocumentsLoader(documents_and_images_path.documents)
-            await documents_loader.load_documents(self.temp_dir)
+            documents_loader = DocumentsLoader(
+                documents_and_images_path.documents, documents_process_pool
+            )
+            await documents_loader.load_documents(self.temp_dir, split_documents=True)
 
             print("-" * 40)
             print("Generating Document Summary")
-            summary = await generate_document_summary(documents_loader.documents)
+            summary, _ = await asyncio.gather(
+                generate_document_summary(
+                    documents_loader.documents,
+                    on_progress=lambda completed, total: print(
+                        f"Summarized {completed}/{total} parts"
+                    ),
+                ),
+                asyncio.to_thread(
+                    build_chunks_index,
+                    self.presentation_id,
+                    documents_loader.splitted_documents,
+                ),
+            )
 
         print("-" * 40)
         print("Generating PPT Outline")
@@ -69,11 +88,17 @@ class GeneratePresentationHandler(FetchAssetsOnPresentationGenerationMixin):
 
         print("-" * 40)
         print("Generating Presentation")
+        slides_excerpts = await asyncio.to_thread(
+            search_document_chunks,
+            self.presentation_id,
+            [f"{each.title}\n{each.body}" for each in presentation_content.slides],
+        )
         presentation_text = (
             await generate_presentation(
                 presentation_content.title,
                 presentation_content.notes,
                 presentation_content.slides,
+                slides_excerpts,
             )
         ).content
 
@@ -1,10 +1,12 @@
+import asyncio
 import uuid
 from api.models import LogMetadata
 from api.routers.presentation.models import GeneratePresentationRequirementsRequest
 from api.services.logging import LoggingService
 from api.services.database import get_sql_session
-from api.services.instances import temp_file_service
+from api.services.instances import documents_process_pool, temp_file_service
 from api.sql_models import PresentationSqlModel
+from document_processor.chunks_index import build_chunks_index
 from document_processor.loader import DocumentsLoader
 from ppt_config_generator.document_summary_generator import generate_document_summary
 
@@ -33,10 +35,23 @@ class GeneratePresentationRequirementsHandler:
 
         all_document_paths = [*self.documents]
 
-        documents_loader = DocumentsLoader(all_document_paths)
-        await documents_loader.load_documents(self.temp_dir)
+        documents_loader = DocumentsLoader(all_document_paths, documents_process_pool)
+        await documents_loader.load_documents(self.temp_dir, split_documents=True)
 
-        summary = await generate_document_summary(documents_loader.documents)
+        logging_service.logger.info(
+            logging_service.message({"load_times": documents_loader.load_times}),
+            extra=log_metadata.model_dump(),
+        )
+
+        # ? Chunks are indexed while documents are summarized
+        summary, _ = await asyncio.gather(
+            generate_document_summary(documents_loader.documents),
+            asyncio.to_thread(
+                build_chunks_index,
+                self.presentation_id,
+                documents_loader.splitted_documents,
+            ),
+        )
 
         presentation = PresentationSqlModel(
             id=self.presentation_id,
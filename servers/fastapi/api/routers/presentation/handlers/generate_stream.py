@@ -1,8 +1,10 @@
+import asyncio
 import json
-from typing import List
+from typing import Dict, List
 
 from fastapi import HTTPException
 from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from sqlmodel import delete
 
 from api.models import LogMetadata, SSECompleteResponse, SSEResponse, SSEStatusResponse
@@ -18,9 +20,11 @@ from api.services.database import get_sql_session
 from api.services.logging import LoggingService
 from api.sql_models import KeyValueSqlModel, PresentationSqlModel, SlideSqlModel
 from api.utils import get_presentation_dir
+from document_processor.chunks_index import search_document_chunks
 from ppt_generator.generator import generate_presentation_stream
 from ppt_generator.models.llm_models import LLMPresentationModel
 from ppt_generator.models.slide_model import SlideModel
+from ppt_generator.slides_stream_parser import SlidesStreamParser
 from api.services.instances import temp_file_service
 from langchain_core.output_parsers import JsonOutputParser
 
@@ -87,28 +91,57 @@ class PresentationGenerateStreamHandler(FetchAssetsOnPresentationGenerationMixin
             event="response", data=json.dumps({"status": "Analyzing information 📊"})
         ).to_string()
 
-        presentation_text = ""
-
-        async for chunk in generate_presentation_stream(
-            self.title, presentation.notes, self.outlines
-        ):
-            presentation_text += chunk.content
-            yield SSEResponse(
-                event="response",
-                data=json.dumps({"type": "chunk", "chunk": chunk.content}),
-            ).to_string()
-
-        presentation_json = output_parser.parse(presentation_text)
-
-        slide_models: List[SlideModel] = []
-        for i, content in enumerate(presentation_json["slides"]):
-            content["index"] = i
-            content["presentation"] = presentation.id
-            slide_model = SlideModel(**content)
-            slide_models.append(slide_model)
+        # ? Every slide is grounded on document chunks relevant to its outline
+        slides_excerpts = await asyncio.to_thread(
+            search_document_chunks,
+            self.presentation_id,
+            [f"{each.title}\n{each.body}" for each in self.outlines],
+        )
 
-        async for result in self.fetch_slide_assets(slide_models):
-            yield result
+        slides_parser = SlidesStreamParser()
+
+        # ? Slides are built as soon as they are streamed completely
+        # ? so that their images are generated while rest of the slides are streamed
+        streamed_slide_models: Dict[int, SlideModel] = {}
+        images_generations: Dict[int, List[asyncio.Task]] = {}
+
+        try:
+            async for chunk in generate_presentation_stream(
+                self.title, presentation.notes, self.outlines, slides_excerpts
+            ):
+                yield SSEResponse(
+                    event="response",
+                    data=json.dumps({"type": "chunk", "chunk": chunk.content}),
+                ).to_string()
+
+                for index, content in slides_parser.feed(chunk.content):
+                    slide_model = self.get_slide_model(index, content, presentation.id)
+                    if slide_model:
+                        streamed_slide_models[index] = slide_model
+                        images_generations[index] = (
+                            self.start_slide_images_generation(slide_model)
+                        )
+
+            presentation_json = output_parser.parse(slides_parser.text)
+
+            slide_models: List[SlideModel] = []
+            for i, content in enumerate(presentation_json["slides"]):
+                slide_model = streamed_slide_models.get(i)
+                if not slide_model:
+                    content["index"] = i
+                    content["presentation"] = presentation.id
+                    slide_model = SlideModel(**content)
+                slide_models.append(slide_model)
+
+            async for result in self.fetch_slide_assets(
+                slide_models, images_generations
+            ):
+                yield result
+
+        finally:
+            for each in images_generations.values():
+                for each_task in each:
+                    each_task.cancel()
 
         slide_sql_models = [
             SlideSqlModel(**each.model_dump(mode="json")) for each in slide_models
@@ -127,3 +160,11 @@ class PresentationGenerateStreamHandler(FetchAssetsOnPresentationGenerationMixin
         ).to_response_dict()
 
         yield SSECompleteResponse(key="presentation", value=response).to_string()
+
+    def get_slide_model(self, index: int, content: dict, presentation_id: str):
+        try:
+            content["index"] = index
+            content["presentation"] = presentation_id
+            return SlideModel(**content)
+        except ValidationError:
+            return None
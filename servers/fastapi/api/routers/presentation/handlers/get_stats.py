@@ -0,0 +1,39 @@
+from api.models import LogMetadata
+from api.services.instances import (
+    documents_process_pool,
+    export_worker_pool,
+    generated_images_cache,
+    llm_client_registry,
+    llm_request_coalescer,
+    llm_response_cache,
+    llm_scheduler,
+    pictures_process_pool,
+    processed_pictures_cache,
+    slides_cache,
+)
+from api.services.logging import LoggingService
+from ppt_generator.fix_validation_errors import validation_fixes
+
+
+class GetStatsHandler:
+
+    async def get(self, logging_service: LoggingService, log_metadata: LogMetadata):
+        stats = {
+            "export_worker_pool": export_worker_pool.stats,
+            "llm_client_registry": llm_client_registry.stats,
+            "llm_scheduler": llm_scheduler.stats,
+            "llm_request_coalescer": llm_request_coalescer.stats,
+            "llm_response_cache": llm_response_cache.stats,
+            "generated_images_cache": generated_images_cache.stats,
+            "processed_pictures_cache": processed_pictures_cache.stats,
+            "slides_cache": slides_cache.stats,
+            "pictures_process_pool": pictures_process_pool.stats,
+            "documents_process_pool": documents_process_pool.stats,
+            "validation_fixes": validation_fixes,
+        }
+
+        logging_service.logger.info(
+            logging_service.message(stats),
+            extra=log_metadata.model_dump(),
+        )
+        return stats
@@ -7,7 +7,6 @@ from api.routers.presentation.models import (
 from api.services.logging import LoggingService
 from image_processor.icons_finder import get_icons
 from api.services.instances import temp_file_service
-from image_processor.icons_vectorstore_utils import get_icons_vectorstore
 
 
 class SearchIconHandler:
@@ -25,10 +24,7 @@ class SearchIconHandler:
             extra=log_metadata.model_dump(),
         )
 
-        vector_store = get_icons_vectorstore()
-
         icon_paths = await get_icons(
-            vector_store,
             self.data.query or "",
             self.data.page,
             self.data.limit,
@@ -1,58 +1,98 @@
 import asyncio
-from typing import List
+from typing import Dict, List, Optional
 
-from api.models import SSEStatusResponse
+from api.models import SSEAssetResponse, SSEStatusResponse
 from api.utils import get_presentation_images_dir
-from image_processor.icons_finder import get_icon
-from image_processor.icons_vectorstore_utils import get_icons_vectorstore
+from image_processor.icons_finder import get_icons_for_queries
 from image_processor.images_finder import generate_image
+from ppt_generator.models.query_and_prompt_models import (
+    ImagePromptWithThemeAndAspectRatio,
+)
 from ppt_generator.models.slide_model import SlideModel
 from ppt_generator.slide_model_utils import SlideModelUtils
 
 
 class FetchAssetsOnPresentationGenerationMixin:
 
-    async def fetch_slide_assets(self, slide_models: List[SlideModel]):
-        image_prompts = []
-        icon_queries = []
-
-        for each_slide_model in slide_models:
-            slide_model_utils = SlideModelUtils(self.theme, each_slide_model)
-            image_prompts.extend(slide_model_utils.get_image_prompts())
-            icon_queries.extend(slide_model_utils.get_icon_queries())
-
-        if icon_queries:
-            icon_vector_store = get_icons_vectorstore()
-
+    def start_slide_images_generation(
+        self, slide_model: SlideModel
+    ) -> List[asyncio.Task]:
+        image_prompts = SlideModelUtils(self.theme, slide_model).get_image_prompts()
         images_directory = get_presentation_images_dir(self.presentation_id)
 
-        coroutines = [
-            generate_image(
-                each,
-                images_directory,
+        slide_model.images = [None] * len(image_prompts)
+        return [
+            asyncio.create_task(
+                self.generate_slide_image(slide_model, index, each, images_directory)
             )
-            for each in image_prompts
-        ] + [get_icon(icon_vector_store, each) for each in icon_queries]
-
-        assets_future = asyncio.gather(*coroutines)
-
-        while not assets_future.done():
-            status = SSEStatusResponse(status="Fetching slide assets").to_string()
-            yield status
-            await asyncio.sleep(5)
-
-        assets = await assets_future
-
-        image_prompts_len = len(image_prompts)
-
-        images = assets[:image_prompts_len]
-        icons = assets[image_prompts_len:]
-
+            for index, each in enumerate(image_prompts)
+        ]
+
+    async def generate_slide_image(
+        self,
+        slide_model: SlideModel,
+        index: int,
+        image_prompt: ImagePromptWithThemeAndAspectRatio,
+        images_directory: str,
+    ) -> List[SSEAssetResponse]:
+        image_path = await generate_image(image_prompt, images_directory)
+        slide_model.images[index] = image_path
+        return [
+            SSEAssetResponse(
+                slide=slide_model.index, kind="image", index=index, path=image_path
+            )
+        ]
+
+    async def fetch_slide_icons(
+        self, slide_models: List[SlideModel]
+    ) -> List[SSEAssetResponse]:
+        # ? Icons of every slide are resolved together in a single batch
+        icon_queries_of_slides = [
+            SlideModelUtils(self.theme, each).get_icon_queries() for each in slide_models
+        ]
+        icons = await get_icons_for_queries(
+            [each for icon_queries in icon_queries_of_slides for each in icon_queries]
+        )
+
+        assets = []
+        for each_slide_model, icon_queries in zip(slide_models, icon_queries_of_slides):
+            each_slide_model.icons = icons[: len(icon_queries)]
+            icons = icons[len(icon_queries) :]
+            assets.extend(
+                SSEAssetResponse(
+                    slide=each_slide_model.index, kind="icon", index=index, path=path
+                )
+                for index, path in enumerate(each_slide_model.icons)
+            )
+        return assets
+
+    async def fetch_slide_assets(
+        self,
+        slide_models: List[SlideModel],
+        started_images_generations: Optional[Dict[int, List[asyncio.Task]]] = None,
+    ):
+        # ? Images of slides already being generated are not generated again
+        images_generations = dict(started_images_generations or {})
         for each_slide_model in slide_models:
-            each_slide_model.images = images[: each_slide_model.images_count]
-            images = images[each_slide_model.images_count :]
-
-            each_slide_model.icons = icons[: each_slide_model.icons_count]
-            icons = icons[each_slide_model.icons_count :]
+            if each_slide_model.index not in images_generations:
+                images_generations[each_slide_model.index] = (
+                    self.start_slide_images_generation(each_slide_model)
+                )
+
+        assets_fetches = [asyncio.create_task(self.fetch_slide_icons(slide_models))]
+        for each in images_generations.values():
+            assets_fetches.extend(each)
+
+        try:
+            yield SSEStatusResponse(status="Fetching slide assets").to_string()
+
+            # ? Assets are streamed as soon as each of them is fetched
+            for assets_fetch in asyncio.as_completed(assets_fetches):
+                for each_asset in await assets_fetch:
+                    yield each_asset.to_string()
+        finally:
+            # ? Fetches are not left running if client disconnects or one of them fails
+            for each in assets_fetches:
+                each.cancel()
 
         yield SSEStatusResponse(status="Slide assets fetched").to_string()
@@ -104,6 +104,9 @@ class UpdatePresentationThemeRequest(BaseModel):
 class ExportAsRequest(BaseModel):
     presentation_id: str
     pptx_model: PptxPresentationModel
+    target_dpi: Optional[int] = Field(default=None, ge=36, le=600)
+    jpeg_quality: Optional[int] = Field(default=None, ge=1, le=95)
+    compression_level: Optional[int] = Field(default=None, ge=0, le=9)
 
 
 class DecomposeDocumentsResponse(BaseModel):
@@ -34,6 +34,7 @@ from api.routers.presentation.handlers.generate_outlines import (
 )
 from api.routers.presentation.handlers.get_presentation import GetPresentationHandler
 from api.routers.presentation.handlers.get_presentations import GetPresentationsHandler
+from api.routers.presentation.handlers.get_stats import GetStatsHandler
 from api.routers.presentation.handlers.search_icon import SearchIconHandler
 from api.routers.presentation.handlers.search_image import SearchImageHandler
 from api.routers.presentation.handlers.update_parsed_document import (
@@ -90,6 +91,13 @@ async def get_user_presentations():
     )
 
 
+@presentation_router.get("/stats")
+async def get_stats():
+    request_utils = RequestUtils(f"{route_prefix}/stats")
+    logging_service, log_metadata = await request_utils.initialize_logger()
+    return await handle_errors(GetStatsHandler().get, logging_service, log_metadata)
+
+
 @presentation_router.get("/presentation", response_model=PresentationAndSlides)
 async def get_presentation_from_id(presentation_id: str):
     request_utils = RequestUtils(f"{route_prefix}/presentation")
@@ -305,6 +313,17 @@ async def export_as_pptx(data: ExportAsRequest):
     )
 
 
+@presentation_router.post("/presentation/export_as_pptx/download")
+async def download_as_pptx(data: ExportAsRequest):
+    request_utils = RequestUtils(f"{route_prefix}/presentation/export_as_pptx/download")
+    logging_service, log_metadata = await request_utils.initialize_logger(
+        presentation_id=data.presentation_id,
+    )
+    return await handle_errors(
+        ExportAsPptxHandler(data).download, logging_service, log_metadata
+    )
+
+
 @presentation_router.delete("/delete", status_code=204)
 async def delete_presentation(presentation_id: str):
     request_utils = RequestUtils(f"{route_prefix}/delete")
@@ -0,0 +1,127 @@
+import functools
+import glob
+import hashlib
+import os
+import shutil
+import threading
+import uuid
+from typing import Optional
+
+
+@functools.lru_cache(maxsize=1024)
+def _get_file_hash(file_path: str, mtime_ns: int, size: int) -> str:
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def get_file_hash(file_path: str) -> str:
+    # ? Files are only hashed again when they have been modified
+    stat = os.stat(file_path)
+    return _get_file_hash(os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+
+
+def link_or_copy_file(source_path: str, destination_path: str):
+    try:
+        os.link(source_path, destination_path)
+    except OSError:
+        shutil.copyfile(source_path, destination_path)
+
+
+class FileCacheService:
+
+    def __init__(self, cache_dir: str, max_size_mb: float):
+        self.cache_dir = cache_dir
+        self.max_size = int(max_size_mb * 1024 * 1024)
+
+        self.hits = 0
+        self.misses = 0
+
+        self._size: Optional[int] = None
+        self._lock = threading.Lock()
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @property
+    def stats(self) -> dict:
+        requests = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / requests if requests else 0,
+            "size": self._size,
+            "max_size": self.max_size,
+        }
+
+    def get_entry_dir(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2])
+
+    def get(self, key: str) -> Optional[str]:
+        for each in glob.glob(os.path.join(self.get_entry_dir(key), f"{key}.*")):
+            try:
+                # ? Access time is kept in mtime for least recently used eviction
+                os.utime(each)
+            except FileNotFoundError:
+                continue
+            with self._lock:
+                self.hits += 1
+            return each
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, file_path: str) -> str:
+        entry_dir = self.get_entry_dir(key)
+        os.makedirs(entry_dir, exist_ok=True)
+
+        entry_path = os.path.join(entry_dir, key + os.path.splitext(file_path)[1])
+        temp_path = os.path.join(entry_dir, f".{uuid.uuid4()}")
+        link_or_copy_file(file_path, temp_path)
+        size = os.path.getsize(temp_path)
+        # ? Size of replaced entry is not counted twice
+        try:
+            replaced_size = os.path.getsize(entry_path)
+        except FileNotFoundError:
+            replaced_size = 0
+        os.replace(temp_path, entry_path)
+
+        with self._lock:
+            if self._size is not None:
+                self._size += size - replaced_size
+
+        self.evict()
+        return entry_path
+
+    def evict(self):
+        with self._lock:
+            if self._size is not None and self._size <= self.max_size:
+                return
+
+            entries = []
+            for root, _, files in os.walk(self.cache_dir):
+                for name in files:
+                    # ? Entries being put are linked to hidden temp files first,
+                    # ? they keep mtime of their source so they are not evicted
+                    if name.startswith("."):
+                        continue
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, path))
+
+            size = sum(each[1] for each in entries)
+            for _, entry_size, path in sorted(entries):
+                if size <= self.max_size:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                size -= entry_size
+
+            self._size = size
@@ -1,4 +1,58 @@
+import os
+
+from api.services.file_cache import FileCacheService
+from api.services.llm_client_registry import LLMClientRegistry
+from api.services.llm_coalescer import LLMRequestCoalescer
+from api.services.llm_response_cache import LLMResponseCacheService
+from api.services.llm_scheduler import LLMScheduler
+from api.services.process_pool import ProcessPoolService
 from api.services.temp_file import TempFileService
+from api.services.worker_pool import WorkerPoolService
+
+
+temp_file_service = TempFileService()
+
+llm_client_registry = LLMClientRegistry(int(os.getenv("LLM_MAX_CONNECTIONS") or 100))
+
+# ? Every LLM request is queued per provider and model, edits are served before generations
+llm_scheduler = LLMScheduler.from_env(os.getenv)
+
+llm_request_coalescer = LLMRequestCoalescer()
+
+llm_response_cache = LLMResponseCacheService(
+    os.getenv("LLM_RESPONSE_CACHE") == "true",
+    float(os.getenv("LLM_RESPONSE_CACHE_TTL_HOURS") or 168),
+    float(os.getenv("LLM_RESPONSE_CACHE_SIZE_MB") or 64),
+)
+
+generated_images_cache = FileCacheService(
+    os.path.join(os.getenv("APP_DATA_DIRECTORY"), "cache", "images"),
+    float(os.getenv("GENERATED_IMAGES_CACHE_SIZE_MB") or 1024),
+)
+
+processed_pictures_cache = FileCacheService(
+    os.path.join(os.getenv("APP_DATA_DIRECTORY"), "cache", "pictures"),
+    float(os.getenv("PROCESSED_PICTURES_CACHE_SIZE_MB") or 512),
+)
+
+slides_cache = FileCacheService(
+    os.path.join(os.getenv("APP_DATA_DIRECTORY"), "cache", "slides"),
+    float(os.getenv("SLIDES_CACHE_SIZE_MB") or 512),
+)
+
+pictures_process_pool_workers = int(
+    os.getenv("PPTX_IMAGE_WORKERS") or min(4, os.cpu_count() or 1)
+)
+# ? Pictures are processed sequentially where pool can't be used
+pictures_process_pool = ProcessPoolService(pictures_process_pool_workers)
 
+documents_process_pool_workers = int(
+    os.getenv("DOCUMENT_LOADER_WORKERS") or min(4, os.cpu_count() or 1)
+)
+# ? Documents are loaded in threads where pool can't be used
+documents_process_pool = ProcessPoolService(documents_process_pool_workers)
 
-temp_file_service = TempFileService()
\ No newline at end of file
+# ? Exports run outside the event loop, extra exports wait in queue
+export_worker_pool = WorkerPoolService(
+    int(os.getenv("EXPORT_WORKERS") or 2), thread_name_prefix="export"
+)
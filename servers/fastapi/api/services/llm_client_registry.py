@@ -0,0 +1,109 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import httpx
+from langchain_core.language_models import BaseChatModel
+from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_openai import ChatOpenAI
+from openai import AsyncOpenAI
+
+API_KEY_ENVS = {
+    "openai": "OPENAI_API_KEY",
+    "google": "GOOGLE_API_KEY",
+}
+
+
+class LLMClientRegistry:
+
+    def __init__(self, max_connections: int = 100, keepalive_expiry: float = 60):
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._http_client: Optional[httpx.Client] = None
+        self._http_async_client: Optional[httpx.AsyncClient] = None
+
+        # ? Clients by (provider, model, params) with hash of api key they were built with
+        self._clients: Dict[Tuple[str, str, str], Tuple[str, Any]] = {}
+        self._lock = threading.Lock()
+
+        self.created = 0
+        self.reused = 0
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "clients": len(self._clients),
+            "created": self.created,
+            "reused": self.reused,
+        }
+
+    def get_api_key_hash(self, provider: str) -> str:
+        api_key = os.getenv(API_KEY_ENVS[provider]) or ""
+        return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+    def get_http_clients(self) -> Tuple[httpx.Client, httpx.AsyncClient]:
+        # ? Every OpenAI client shares one connection pool, so TLS sessions are reused
+        if self._http_client is None:
+            self._http_client = httpx.Client(limits=self._limits, timeout=None)
+            self._http_async_client = httpx.AsyncClient(
+                limits=self._limits, timeout=None
+            )
+        return self._http_client, self._http_async_client
+
+    def create_chat_model(self, provider: str, model: str, **params) -> BaseChatModel:
+        # ? Requests are only retried by LLM scheduler, so it sees every rate limit
+        # ? and doesn't hold a slot of its lane while client sleeps between retries
+        if provider == "openai":
+            http_client, http_async_client = self.get_http_clients()
+            return ChatOpenAI(
+                model=model,
+                http_client=http_client,
+                http_async_client=http_async_client,
+                max_retries=0,
+                **params,
+            )
+        elif provider == "google":
+            return ChatGoogleGenerativeAI(model=model, max_retries=0, **params)
+        raise ValueError(f"Unknown LLM provider: {provider}")
+
+    def get_client(self, key: Tuple[str, str, str], create_client: Callable[[], Any]):
+        api_key_hash = self.get_api_key_hash(key[0])
+
+        with self._lock:
+            client = self._clients.get(key)
+            # ? Clients are rebuilt only when api key of provider has been changed
+            if client and client[0] == api_key_hash:
+                self.reused += 1
+                return client[1]
+
+            client = create_client()
+            self._clients[key] = (api_key_hash, client)
+            self.created += 1
+            return client
+
+    def get_chat_model(self, provider: str, model: str, **params) -> BaseChatModel:
+        return self.get_client(
+            (provider, model, json.dumps(params, sort_keys=True)),
+            lambda: self.create_chat_model(provider, model, **params),
+        )
+
+    def get_openai_client(self) -> AsyncOpenAI:
+        # ? Used for requests not made through chat models, like image generation
+        return self.get_client(
+            ("openai", "", ""),
+            lambda: AsyncOpenAI(http_client=self.get_http_clients()[1]),
+        )
+
+    async def aclose(self):
+        with self._lock:
+            self._clients.clear()
+        if self._http_client is not None:
+            self._http_client.close()
+            await self._http_async_client.aclose()
+            self._http_client = None
+            self._http_async_client = None
@@ -0,0 +1,130 @@
+import asyncio
+import copy
+import hashlib
+import json
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+
+from api.services.llm_scheduler import get_lane_name
+
+
+def get_llm_request_key(
+    model: BaseChatModel, messages: List[BaseMessage], schema: Optional[dict] = None
+) -> str:
+    request = {
+        "lane": get_lane_name(model),
+        "params": model._identifying_params,
+        "messages": [[each.type, each.content] for each in messages],
+        "schema": schema,
+    }
+    return hashlib.sha256(
+        json.dumps(request, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+class CoalescedStream:
+
+    def __init__(self, stream: AsyncIterator):
+        # ? Every chunk is kept, so subscribers joining later get whole response
+        self.chunks = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.subscribers = 0
+
+        self._updated = asyncio.Event()
+        self.task = asyncio.create_task(self.produce(stream))
+
+    def notify(self):
+        self._updated.set()
+        self._updated = asyncio.Event()
+
+    async def produce(self, stream: AsyncIterator):
+        try:
+            async for chunk in stream:
+                self.chunks.append(chunk)
+                self.notify()
+        except BaseException as e:
+            self.error = e
+        finally:
+            self.done = True
+            self.notify()
+
+    async def subscribe(self) -> AsyncIterator:
+        index = 0
+        while True:
+            while index < len(self.chunks):
+                yield self.chunks[index]
+                index += 1
+            if self.done:
+                if self.error:
+                    raise self.error
+                return
+            await self._updated.wait()
+
+
+class LLMRequestCoalescer:
+
+    def __init__(self):
+        self._requests: Dict[str, asyncio.Task] = {}
+        self._streams: Dict[str, CoalescedStream] = {}
+
+        self.started = 0
+        self.coalesced = 0
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._requests) + len(self._streams),
+            "started": self.started,
+            "coalesced": self.coalesced,
+        }
+
+    def remove_request(self, key: str, task: asyncio.Task):
+        if self._requests.get(key) is task:
+            del self._requests[key]
+        # ? Marks exception as retrieved in case every caller has been cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def remove_stream(self, key: str, stream: CoalescedStream):
+        if self._streams.get(key) is stream:
+            del self._streams[key]
+
+    async def run(self, key: str, get_response: Callable[[], Awaitable[Any]]):
+        task = self._requests.get(key)
+        if task is None:
+            task = asyncio.create_task(get_response())
+            task.add_done_callback(lambda _: self.remove_request(key, task))
+            self._requests[key] = task
+            self.started += 1
+        else:
+            self.coalesced += 1
+
+        # ? Every caller gets its own copy of the response, including the one that
+        # ? started the request, so no caller can change the response of others
+        return copy.deepcopy(await asyncio.shield(task))
+
+    async def stream(
+        self, key: str, get_stream: Callable[[], AsyncIterator]
+    ) -> AsyncIterator:
+        stream = self._streams.get(key)
+        if stream is None:
+            stream = CoalescedStream(get_stream())
+            stream.task.add_done_callback(lambda _: self.remove_stream(key, stream))
+            self._streams[key] = stream
+            self.started += 1
+        else:
+            self.coalesced += 1
+
+        stream.subscribers += 1
+        try:
+            async for chunk in stream.subscribe():
+                yield chunk
+        finally:
+            stream.subscribers -= 1
+            # ? Response nobody is waiting for anymore is not generated further
+            if not stream.subscribers and not stream.done:
+                self.remove_stream(key, stream)
+                stream.task.cancel()
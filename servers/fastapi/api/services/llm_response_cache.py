@@ -0,0 +1,121 @@
+import asyncio
+import json
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Optional, Type, TypeVar
+
+from pydantic import BaseModel
+from sqlmodel import delete, func, select
+
+from api.services.database import get_sql_session
+from api.sql_models import LLMResponseCacheSqlModel
+
+T = TypeVar("T", bound=BaseModel)
+
+LLM_CACHE_BYPASS_HEADER = "X-LLM-Cache"
+
+# ? Set for requests sent with "X-LLM-Cache: bypass" header
+llm_response_cache_bypass: ContextVar[bool] = ContextVar(
+    "llm_response_cache_bypass", default=False
+)
+
+
+class LLMResponseCacheService:
+
+    def __init__(self, enabled: bool, ttl_hours: float, max_size_mb: float):
+        self.enabled = enabled
+        self.ttl = timedelta(hours=ttl_hours)
+        self.max_size = int(max_size_mb * 1024 * 1024)
+
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+    @property
+    def stats(self) -> dict:
+        requests = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": self.hits / requests if requests else 0,
+        }
+
+    def get(self, key: str) -> Optional[dict]:
+        with get_sql_session() as sql_session:
+            cached = sql_session.get(LLMResponseCacheSqlModel, key)
+            if not cached:
+                return None
+            if cached.created_at < datetime.now() - self.ttl:
+                sql_session.delete(cached)
+                sql_session.commit()
+                return None
+
+            cached.accessed_at = datetime.now()
+            sql_session.commit()
+            return cached.response
+
+    def put(self, key: str, response: dict):
+        with get_sql_session() as sql_session:
+            sql_session.merge(
+                LLMResponseCacheSqlModel(
+                    id=key, response=response, size=len(json.dumps(response))
+                )
+            )
+            sql_session.commit()
+            self.evict(sql_session)
+
+    def evict(self, sql_session):
+        sql_session.exec(
+            delete(LLMResponseCacheSqlModel).where(
+                LLMResponseCacheSqlModel.created_at < datetime.now() - self.ttl
+            )
+        )
+        sql_session.commit()
+
+        # ? Least recently used responses are removed to stay under max size,
+        # ? only their ids and sizes are loaded to pick them
+        size = sql_session.exec(select(func.sum(LLMResponseCacheSqlModel.size))).one()
+        if not size or size <= self.max_size:
+            return
+        to_delete_ids = []
+        for response_id, each_size in sql_session.exec(
+            select(LLMResponseCacheSqlModel.id, LLMResponseCacheSqlModel.size).order_by(
+                LLMResponseCacheSqlModel.accessed_at
+            )
+        ):
+            if size <= self.max_size:
+                break
+            size -= each_size
+            to_delete_ids.append(response_id)
+        sql_session.exec(
+            delete(LLMResponseCacheSqlModel).where(
+                LLMResponseCacheSqlModel.id.in_(to_delete_ids)
+            )
+        )
+        sql_session.commit()
+
+    async def run(
+        self,
+        key: str,
+        response_model: Type[T],
+        get_response: Callable[[], Awaitable[T]],
+    ) -> T:
+        if not self.enabled:
+            return await get_response()
+
+        # ? Bypassed requests skip cached response but still refresh it
+        if llm_response_cache_bypass.get():
+            self.bypassed += 1
+        else:
+            # ? SQLite is queried in a thread so event loop is not blocked
+            cached = await asyncio.to_thread(self.get, key)
+            if cached is not None:
+                self.hits += 1
+                return response_model.model_validate(cached)
+            self.misses += 1
+
+        response = await get_response()
+        await asyncio.to_thread(self.put, key, response.model_dump(mode="json"))
+        return response
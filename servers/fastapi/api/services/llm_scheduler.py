@@ -0,0 +1,294 @@
+import asyncio
+import heapq
+import itertools
+import json
+import random
+import time
+from enum import IntEnum
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.runnables import Runnable
+from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_openai import ChatOpenAI
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+RETRYABLE_ERRORS = {
+    "APIConnectionError",
+    "APITimeoutError",
+    "DeadlineExceeded",
+    "InternalServerError",
+    "RateLimitError",
+    "ResourceExhausted",
+    "ServiceUnavailable",
+    "TooManyRequests",
+}
+
+
+class LLMPriority(IntEnum):
+    INTERACTIVE = 0
+    BATCH = 1
+
+
+def get_lane_name(model: BaseChatModel) -> str:
+    if isinstance(model, ChatOpenAI):
+        return f"openai:{model.model_name}"
+    elif isinstance(model, ChatGoogleGenerativeAI):
+        return f"google:{model.model.split('/')[-1]}"
+    return f"{type(model).__name__}:{getattr(model, 'model', None)}"
+
+
+def is_retryable_error(error: Exception) -> bool:
+    status_code = getattr(error, "status_code", None) or getattr(error, "code", None)
+    return (
+        type(error).__name__ in RETRYABLE_ERRORS
+        or status_code in RETRYABLE_STATUS_CODES
+    )
+
+
+def get_retry_after(error: Exception) -> Optional[float]:
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def estimate_tokens(input: Any) -> int:
+    # ? Roughly 4 characters per token
+    return len(str(input)) // 4 + 1
+
+
+class TokenBucket:
+
+    def __init__(self, per_minute: int):
+        # ? Bucket with 0 capacity does not limit anything
+        self.capacity = per_minute
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60
+        self.updated_at = time.monotonic()
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+
+    def get_wait_time(self, amount: float) -> float:
+        if not self.capacity:
+            return 0
+        self.refill()
+        amount = min(amount, self.capacity)
+        return 0 if self.tokens >= amount else (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float):
+        if self.capacity:
+            self.refill()
+            self.tokens -= amount
+
+
+class LLMLane:
+
+    def __init__(self, max_concurrency: int, rpm: int, tpm: int):
+        self.max_concurrency = max_concurrency
+        self.requests_bucket = TokenBucket(rpm)
+        self.tokens_bucket = TokenBucket(tpm)
+
+        self.running = 0
+        self.waiters: List[Tuple[int, int, asyncio.Future]] = []
+
+        self.queued = 0
+        self.completed = 0
+        self.failed = 0
+        self.retries = 0
+        self.started = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "queued": self.queued,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "retries": self.retries,
+            "average_wait_time": (
+                self.total_wait_time / self.started if self.started else 0
+            ),
+            "max_wait_time": self.max_wait_time,
+        }
+
+
+class LLMScheduler:
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        max_retries: int = 3,
+        retry_base_delay: float = 1,
+        retry_max_delay: float = 30,
+        lane_limits: Optional[Dict[str, dict]] = None,
+    ):
+        self.max_concurrency = max_concurrency
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        # ? Limits of specific lanes, e.g. {"openai:gpt-4.1": {"rpm": 500}}
+        self.lane_limits = lane_limits or {}
+
+        self._lanes: Dict[str, LLMLane] = {}
+        self._sequence = itertools.count()
+
+    @classmethod
+    def from_env(cls, getenv) -> "LLMScheduler":
+        return cls(
+            max_concurrency=int(getenv("LLM_MAX_CONCURRENCY") or 8),
+            requests_per_minute=int(getenv("LLM_REQUESTS_PER_MINUTE") or 0),
+            tokens_per_minute=int(getenv("LLM_TOKENS_PER_MINUTE") or 0),
+            max_retries=int(getenv("LLM_MAX_RETRIES") or 3),
+            lane_limits=json.loads(getenv("LLM_LANE_LIMITS") or "{}"),
+        )
+
+    @property
+    def stats(self) -> dict:
+        return {name: lane.stats for name, lane in self._lanes.items()}
+
+    def get_lane(self, name: str) -> LLMLane:
+        if name not in self._lanes:
+            limits = self.lane_limits.get(name, {})
+            self._lanes[name] = LLMLane(
+                limits.get("max_concurrency", self.max_concurrency),
+                limits.get("rpm", self.requests_per_minute),
+                limits.get("tpm", self.tokens_per_minute),
+            )
+        return self._lanes[name]
+
+    async def acquire(self, lane: LLMLane, priority: LLMPriority, tokens: int):
+        queued_at = time.monotonic()
+
+        if lane.running >= lane.max_concurrency or lane.waiters:
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(lane.waiters, (priority, next(self._sequence), future))
+            lane.queued += 1
+            try:
+                await future
+            except asyncio.CancelledError:
+                # ? Slot handed over right before cancellation is passed on
+                if future.done() and not future.cancelled():
+                    self.release(lane)
+                raise
+            finally:
+                lane.queued -= 1
+        else:
+            lane.running += 1
+
+        try:
+            while True:
+                wait_time = max(
+                    lane.requests_bucket.get_wait_time(1),
+                    lane.tokens_bucket.get_wait_time(tokens),
+                )
+                if wait_time <= 0:
+                    break
+                await asyncio.sleep(wait_time)
+        except asyncio.CancelledError:
+            self.release(lane)
+            raise
+        lane.requests_bucket.consume(1)
+        lane.tokens_bucket.consume(tokens)
+
+        wait_time = time.monotonic() - queued_at
+        lane.started += 1
+        lane.total_wait_time += wait_time
+        lane.max_wait_time = max(lane.max_wait_time, wait_time)
+
+    def release(self, lane: LLMLane):
+        # ? Slot is handed to waiter with highest priority, then oldest one
+        while lane.waiters:
+            _, _, future = heapq.heappop(lane.waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        lane.running -= 1
+
+    def get_retry_delay(self, error: Exception, attempt: int) -> float:
+        retry_after = get_retry_after(error)
+        if retry_after is not None:
+            return min(retry_after, self.retry_max_delay)
+        delay = min(self.retry_max_delay, self.retry_base_delay * 2**attempt)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    async def ainvoke(
+        self,
+        runnable: Runnable,
+        input: Any,
+        model: BaseChatModel,
+        priority: LLMPriority = LLMPriority.BATCH,
+        **kwargs,
+    ):
+        lane = self.get_lane(get_lane_name(model))
+        tokens = estimate_tokens(input)
+
+        for attempt in range(self.max_retries + 1):
+            await self.acquire(lane, priority, tokens)
+            try:
+                response = await runnable.ainvoke(input, **kwargs)
+                lane.completed += 1
+                return response
+            except Exception as e:
+                if attempt == self.max_retries or not is_retryable_error(e):
+                    lane.failed += 1
+                    raise
+                delay = self.get_retry_delay(e, attempt)
+                print(f"LLM request failed, retrying in {delay:.1f}s: {e}")
+            finally:
+                self.release(lane)
+
+            lane.retries += 1
+            await asyncio.sleep(delay)
+
+    async def astream(
+        self,
+        runnable: Runnable,
+        input: Any,
+        model: BaseChatModel,
+        priority: LLMPriority = LLMPriority.BATCH,
+        **kwargs,
+    ) -> AsyncIterator:
+        lane = self.get_lane(get_lane_name(model))
+        tokens = estimate_tokens(input)
+
+        for attempt in range(self.max_retries + 1):
+            await self.acquire(lane, priority, tokens)
+            streamed = False
+            try:
+                async for chunk in runnable.astream(input, **kwargs):
+                    streamed = True
+                    yield chunk
+                lane.completed += 1
+                return
+            except Exception as e:
+                # ? Streams are only retried if nothing has been streamed yet
+                if (
+                    streamed
+                    or attempt == self.max_retries
+                    or not is_retryable_error(e)
+                ):
+                    lane.failed += 1
+                    raise
+                delay = self.get_retry_delay(e, attempt)
+                print(f"LLM stream failed, retrying in {delay:.1f}s: {e}")
+            finally:
+                self.release(lane)
+
+            lane.retries += 1
+            await asyncio.sleep(delay)
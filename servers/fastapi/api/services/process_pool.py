@@ -0,0 +1,133 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Iterable, List, Optional, Tuple
+
+
+class ProcessPoolTaskError(Exception):
+    pass
+
+
+class ProcessPoolService:
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        # ? Workers are started by a fork server instead of forking the server
+        # ? process, which has threads running by the time pool is used
+        self.enabled = (
+            max_workers > 1 and "forkserver" in multiprocessing.get_all_start_methods()
+        )
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+        self.restarts = 0
+        self.crashes = 0
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "max_workers": self.max_workers if self.enabled else 0,
+            "started": self._executor is not None,
+            "restarts": self.restarts,
+            "crashes": self.crashes,
+        }
+
+    def start(self):
+        if not self.enabled:
+            return
+        with self._lock:
+            if not self._executor:
+                self._executor = ProcessPoolExecutor(
+                    self.max_workers,
+                    mp_context=multiprocessing.get_context("forkserver"),
+                )
+            executor = self._executor
+        # ? Fork server imports the app once, so it is started with the app
+        # ? instead of while requests are being served
+        try:
+            executor.submit(int).result()
+        except BrokenProcessPool:
+            self.restart(executor)
+
+    def restart(self, broken_executor: ProcessPoolExecutor):
+        with self._lock:
+            # ? Pool might already have been replaced by another caller
+            if self._executor is not broken_executor:
+                return
+            self._executor = ProcessPoolExecutor(
+                self.max_workers,
+                mp_context=multiprocessing.get_context("forkserver"),
+            )
+            self.restarts += 1
+        broken_executor.shutdown(wait=False, cancel_futures=True)
+        print("Process pool was broken, started a new one")
+
+    def submit(
+        self, func: Callable, *args
+    ) -> Tuple[Optional[ProcessPoolExecutor], Optional[Future]]:
+        with self._lock:
+            executor = self._executor
+        if not executor:
+            return None, None
+        try:
+            return executor, executor.submit(func, *args)
+        except BrokenProcessPool:
+            self.restart(executor)
+            return self.submit(func, *args)
+
+    def retry(self, func: Callable, *args):
+        # ? Task of a broken pool is retried once in a new worker, it is never
+        # ? retried in-process as it might have crashed its worker
+        executor, future = self.submit(func, *args)
+        if not future:
+            raise ProcessPoolTaskError("Process pool has been shut down")
+        try:
+            return future.result()
+        except BrokenProcessPool:
+            self.restart(executor)
+            self.crashes += 1
+            raise ProcessPoolTaskError(f"Worker crashed while running {func.__name__}")
+
+    def map(self, func: Callable, items: Iterable, crashed_result=None) -> List:
+        items = list(items)
+        submitted = [self.submit(func, each) for each in items]
+        if not any(future for _, future in submitted):
+            # ? Tasks only run in the server process when pool is not used
+            return [func(each) for each in items]
+
+        results = []
+        for (executor, future), each in zip(submitted, items):
+            if future:
+                try:
+                    results.append(future.result())
+                    continue
+                except BrokenProcessPool:
+                    self.restart(executor)
+            # ? Items crashing their worker again get crashed result instead of
+            # ? failing the whole batch
+            try:
+                results.append(self.retry(func, each))
+            except ProcessPoolTaskError as e:
+                print(e)
+                results.append(crashed_result)
+        return results
+
+    async def run(self, func: Callable, *args):
+        executor, future = self.submit(func, *args)
+        if not future:
+            # ? Tasks only run in threads of the server when pool is not used
+            return await asyncio.to_thread(func, *args)
+        try:
+            return await asyncio.wrap_future(future)
+        except BrokenProcessPool:
+            self.restart(executor)
+        return await asyncio.to_thread(self.retry, func, *args)
+
+    def shutdown(self):
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
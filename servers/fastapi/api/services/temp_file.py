@@ -10,7 +10,8 @@ class TempFileService:
         self.cleanup_base_dir()
         os.makedirs(self.base_dir, exist_ok=True)
 
-    def create_dir_in_dir(self, base_dir: str, dir_name: Optional[str] = None) -> str:
+    @staticmethod
+    def create_dir_in_dir(base_dir: str, dir_name: Optional[str] = None) -> str:
         temp_dir = os.path.join(base_dir, dir_name if dir_name else str(uuid.uuid4()))
         os.makedirs(temp_dir, exist_ok=True)
         return temp_dir
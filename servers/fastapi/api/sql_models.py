@@ -55,3 +55,11 @@ class KeyValueSqlModel(SQLModel, table=True):
 class PreferencesSqlModel(SQLModel, table=True):
     id: int = Field(default=0, primary_key=True)
     theme: Optional[dict] = Field(sa_column=Column(JSON, nullable=True), default=None)
+
+
+class LLMResponseCacheSqlModel(SQLModel, table=True):
+    id: str = Field(primary_key=True)
+    response: dict = Field(sa_column=Column(JSON, nullable=False))
+    size: int
+    created_at: datetime = Field(default_factory=datetime.now)
+    accessed_at: datetime = Field(default_factory=datetime.now, index=True)
@@ -0,0 +1,97 @@
+import json
+import os
+from typing import List, Optional
+
+import numpy as np
+from langchain_core.documents import Document
+
+from api.utils import get_presentation_dir
+from image_processor.icons_vectorstore_utils import (
+    get_embedding_model,
+    get_top_k_indices,
+    normalize_rows,
+)
+
+CHUNKS_INDEX_EMBEDDINGS_FILE = "chunks_index.npy"
+CHUNKS_INDEX_CHUNKS_FILE = "chunks_index.json"
+
+
+class DocumentChunksIndex:
+
+    def __init__(self, chunks: List[str], embeddings: np.ndarray):
+        self._chunks = chunks
+        # ? Rows are L2 normalized and stored as float16 to keep index compact
+        self._embeddings = embeddings
+
+    @property
+    def chunks(self) -> List[str]:
+        return self._chunks
+
+    def search(self, queries: List[str], k: int) -> List[List[str]]:
+        if not queries:
+            return []
+
+        query_embeddings = normalize_rows(
+            np.array(list(get_embedding_model().query_embed(queries)), dtype=np.float32)
+        )
+        scores = query_embeddings @ self._embeddings.astype(np.float32).T
+
+        # ? Chunks of every query are returned in document order
+        return [
+            [self._chunks[index] for index in sorted(get_top_k_indices(each, k))]
+            for each in scores
+        ]
+
+
+def build_chunks_index(
+    presentation_id: str, documents: List[Document]
+) -> Optional[DocumentChunksIndex]:
+    chunks = [each.page_content.strip() for each in documents]
+    chunks = [each for each in chunks if each]
+    if not chunks:
+        return None
+
+    try:
+        embeddings = normalize_rows(
+            np.array(list(get_embedding_model().embed(chunks)), dtype=np.float32)
+        ).astype(np.float16)
+
+        presentation_dir = get_presentation_dir(presentation_id)
+        np.save(
+            os.path.join(presentation_dir, CHUNKS_INDEX_EMBEDDINGS_FILE), embeddings
+        )
+        with open(os.path.join(presentation_dir, CHUNKS_INDEX_CHUNKS_FILE), "w") as f:
+            json.dump(chunks, f)
+    except Exception as e:
+        print(f"Could not build document chunks index: {e}")
+        return None
+
+    return DocumentChunksIndex(chunks, embeddings)
+
+
+def load_chunks_index(presentation_id: str) -> Optional[DocumentChunksIndex]:
+    presentation_dir = get_presentation_dir(presentation_id)
+    embeddings_path = os.path.join(presentation_dir, CHUNKS_INDEX_EMBEDDINGS_FILE)
+    chunks_path = os.path.join(presentation_dir, CHUNKS_INDEX_CHUNKS_FILE)
+    if not (os.path.exists(embeddings_path) and os.path.exists(chunks_path)):
+        return None
+
+    with open(chunks_path, "r") as f:
+        chunks = json.load(f)
+    return DocumentChunksIndex(chunks, np.load(embeddings_path, mmap_mode="r"))
+
+
+def search_document_chunks(
+    presentation_id: str, queries: List[str]
+) -> Optional[List[List[str]]]:
+    # ? Presentations generated without documents don't have any chunks
+    try:
+        chunks_index = load_chunks_index(presentation_id)
+        if not chunks_index:
+            return None
+        return chunks_index.search(
+            queries, int(os.getenv("DOCUMENT_CHUNKS_TOP_K") or 3)
+        )
+    except Exception as e:
+        print(f"Could not search document chunks: {e}")
+        return None
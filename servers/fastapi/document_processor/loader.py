@@ -1,13 +1,18 @@
+import asyncio
 import mimetypes
 import os
-from typing import List, Tuple
+import time
+from typing import Iterator, List, Optional, Tuple
 from fastapi import HTTPException
-from langchain_community.document_loaders import TextLoader, PDFPlumberLoader
+from langchain_community.document_loaders import TextLoader
 from langchain_core.documents import Document
+import pdfplumber
+from pdfminer.pdftypes import resolve1
 from langchain_text_splitters import CharacterTextSplitter, MarkdownTextSplitter
 from pptx import Presentation
 from docx import Document as DocxDocument
 
+from api.services.process_pool import ProcessPoolService, ProcessPoolTaskError
 from image_processor.utils import get_page_images_from_pdf_async
 
 PDF_MIME_TYPES = ["application/pdf"]
@@ -25,18 +30,118 @@ UPLOAD_ACCEPTED_DOCUMENTS = (
 )
 
 
+def iter_pdf_pages_text(pdf: pdfplumber.PDF, max_chars: int = 0) -> Iterator[str]:
+    # ? Zero means no limit of characters
+    chars = 0
+    for page in pdf.pages:
+        try:
+            text = (page.extract_text() or "") + "\n"
+        finally:
+            # ? Flushes cached characters and layout objects of the page
+            page.close()
+
+        if max_chars and chars + len(text) >= max_chars:
+            yield text[: max_chars - chars]
+            return
+        chars += len(text)
+        yield text
+
+
+def get_pdf_total_pages(pdf: pdfplumber.PDF) -> int:
+    # ? Read from page tree, as pdf.pages only has the pages being parsed
+    return resolve1(pdf.doc.catalog["Pages"])["Count"]
+
+
+def load_pdf_document(file_path: str) -> List[Document]:
+    # ? Zero means no limit for both max pages and max characters
+    max_pages = int(os.getenv("DOCUMENT_PDF_MAX_PAGES") or 0)
+    max_chars = int(os.getenv("DOCUMENT_PDF_MAX_CHARS") or 0)
+
+    with pdfplumber.open(
+        file_path, pages=range(1, max_pages + 1) if max_pages else None
+    ) as pdf:
+        metadata = {
+            "source": file_path,
+            "file_path": file_path,
+            "page": 0,
+            "total_pages": get_pdf_total_pages(pdf),
+            **{
+                key: value
+                for key, value in pdf.metadata.items()
+                if type(value) in [str, int]
+            },
+        }
+        page_content = "".join(iter_pdf_pages_text(pdf, max_chars))
+
+    return [Document(page_content=page_content, metadata=metadata)]
+
+
+def load_text_document(file_path: str) -> List[Document]:
+    loader = TextLoader(file_path)
+    return loader.load()
+
+
+def load_msword_document(file_path: str) -> List[Document]:
+    document = DocxDocument(file_path)
+    text = "\n".join([paragraph.text for paragraph in document.paragraphs])
+    return [Document(page_content=text)]
+
+
+def load_powerpoint_document(file_path: str) -> List[Document]:
+    presentation = Presentation(file_path)
+
+    extracted_text = ""
+    for index, slide in enumerate(presentation.slides):
+        extracted_text += f"# Slide {index + 1}\n"
+        for shape in slide.shapes:
+            if shape.has_text_frame:
+                for paragraph in shape.text_frame.paragraphs:
+                    extracted_text += f"{paragraph.text}\n"
+                extracted_text += "\n"
+        extracted_text += "\n\n"
+    return [Document(page_content=extracted_text)]
+
+
+# ? Runs in worker processes, so it must stay a module level function and this
+# ? module must not import api.services.instances, which cleans temp directory
+def load_document(
+    file_path: str, mime_type: str, load_markdown: bool
+) -> Tuple[List[Document], float]:
+    started_at = time.perf_counter()
+
+    docs = []
+    if mime_type in PDF_MIME_TYPES:
+        if load_markdown:
+            docs = load_pdf_document(file_path)
+    elif mime_type in TEXT_MIME_TYPES:
+        docs = load_text_document(file_path)
+    elif mime_type in POWERPOINT_TYPES:
+        docs = load_powerpoint_document(file_path)
+    elif mime_type in WORD_TYPES:
+        docs = load_msword_document(file_path)
+
+    return docs, time.perf_counter() - started_at
+
+
 class DocumentsLoader:
 
-    def __init__(self, documents: List[str]):
+    def __init__(
+        self,
+        documents: List[str],
+        process_pool: Optional[ProcessPoolService] = None,
+    ):
         self._document_paths = documents
+        self._process_pool = process_pool
 
         self._documents: List[Document] = []
         self._splitted_documents: List[Document] = []
         self._images: List[List[str]] = []
+        # ? Kept in order of documents, as same path might be loaded twice
+        self._load_times: List[Tuple[str, float]] = []
 
         self._markdown_splitter = MarkdownTextSplitter(chunk_size=500, chunk_overlap=50)
         self._text_splitter = CharacterTextSplitter(
-            separator="/n", chunk_size=500, chunk_overlap=50
+            separator="\n", chunk_size=500, chunk_overlap=50
         )
 
     @property
@@ -51,6 +156,10 @@ class DocumentsLoader:
     def images(self):
         return self._images
 
+    @property
+    def load_times(self):
+        return self._load_times
+
     async def load_documents(
         self,
         temp_dir: str,
@@ -58,40 +167,63 @@ class DocumentsLoader:
         load_markdown: bool = True,
         load_images: bool = False,
     ):
-        documents: List[Document] = []
-        images: List[str] = []
-
-        splitted_documents: List[Document] = []
         for file_path in self._document_paths:
             if not os.path.exists(file_path):
                 raise HTTPException(
                     status_code=404, detail=f"File {file_path} not found"
                 )
 
-            docs = []
-            imgs = []
-
-            mime_type = mimetypes.guess_type(file_path)[0]
-            if mime_type in PDF_MIME_TYPES:
-                docs, imgs = await self.load_pdf(
-                    file_path, load_markdown, load_images, temp_dir
-                )
-            elif mime_type in TEXT_MIME_TYPES:
-                docs = self.load_text(file_path)
-            elif mime_type in POWERPOINT_TYPES:
-                docs = self.load_powerpoint(file_path)
-            elif mime_type in WORD_TYPES:
-                docs = self.load_msword(file_path)
+        mime_types = [mimetypes.guess_type(each)[0] for each in self._document_paths]
+
+        loaded_documents, images = await asyncio.gather(
+            asyncio.gather(
+                *[
+                    self.load_document(file_path, mime_type, load_markdown)
+                    for file_path, mime_type in zip(self._document_paths, mime_types)
+                ]
+            ),
+            asyncio.gather(
+                *[
+                    self.load_pdf_images(file_path, mime_type, load_images, temp_dir)
+                    for file_path, mime_type in zip(self._document_paths, mime_types)
+                ]
+            ),
+        )
 
+        documents: List[Document] = []
+        splitted_documents: List[Document] = []
+        for file_path, mime_type, (docs, load_time) in zip(
+            self._document_paths, mime_types, loaded_documents
+        ):
             documents.extend(docs)
-            images.append(imgs)
+            self._load_times.append((file_path, load_time))
 
             if split_documents:
                 splitted_documents.extend(self.split_documents(docs, mime_type))
 
         self._documents = documents
         self._splitted_documents = splitted_documents
-        self._images = images
+        self._images = list(images)
+
+    async def load_document(
+        self, file_path: str, mime_type: str, load_markdown: bool
+    ) -> Tuple[List[Document], float]:
+        # ? Documents are parsed in worker processes, or in threads if there is no
+        # ? process pool, so event loop is not blocked while they are parsed
+        if not self._process_pool:
+            return await asyncio.to_thread(
+                load_document, file_path, mime_type, load_markdown
+            )
+        try:
+            return await self._process_pool.run(
+                load_document, file_path, mime_type, load_markdown
+            )
+        except ProcessPoolTaskError as e:
+            print(e)
+            raise HTTPException(
+                status_code=422,
+                detail=f"Could not load document {os.path.basename(file_path)}",
+            )
 
     def split_documents(self, documents: List[Document], mime_type):
         return self._text_splitter.split_documents(documents)
@@ -101,52 +233,12 @@ class DocumentsLoader:
             document.page_content = document.page_content[:clip_after]
         return documents
 
-    async def load_pdf(
-        self,
-        file_path: str,
-        load_markdown: bool,
-        load_images: bool,
-        temp_dir: str,
-    ) -> Tuple[List[Document], List[str]]:
-        image_paths = []
-        documents: List[Document] = []
-
-        if load_markdown:
-            loader = PDFPlumberLoader(file_path)
-            docs = loader.load()
-            pdf_document = Document(page_content="")
-            pdf_document.metadata = docs[0].metadata
-            for doc in docs:
-                pdf_document.page_content += doc.page_content
-            documents.append(pdf_document)
-
-        if load_images:
-            image_paths = await get_page_images_from_pdf_async(file_path, temp_dir)
-
-        return documents, image_paths
+    async def load_pdf_images(
+        self, file_path: str, mime_type: str, load_images: bool, temp_dir: str
+    ) -> List[str]:
+        if load_images and mime_type in PDF_MIME_TYPES:
+            return await get_page_images_from_pdf_async(file_path, temp_dir)
+        return []
 
     async def decompose_pdf_to_markdown(self, document_path: str) -> str:
         raise Exception("Not Implemented")
-
-    def load_text(self, file_path: str) -> List[Document]:
-        loader = TextLoader(file_path)
-        return loader.load()
-
-    def load_msword(self, file_path: str) -> List[Document]:
-        document = DocxDocument(file_path)
-        text = "\n".join([paragraph.text for paragraph in document.paragraphs])
-        return [Document(page_content=text)]
-
-    def load_powerpoint(self, file_path: str) -> List[Document]:
-        presentation = Presentation(file_path)
-
-        extracted_text = ""
-        for index, slide in enumerate(presentation.slides):
-            extracted_text += f"# Slide {index + 1}\n"
-            for shape in slide.shapes:
-                if shape.has_text_frame:
-                    for paragraph in shape.text_frame.paragraphs:
-                        extracted_text += f"{paragraph.text}\n"
-                    extracted_text += "\n"
-            extracted_text += "\n\n"
-        return [Document(page_content=extracted_text)]
@@ -1,29 +1,46 @@
+import asyncio
 from typing import List, Optional
 
 from api.utils import get_resource
+from image_processor.icons_vectorstore_utils import get_icons_index
 from ppt_generator.models.query_and_prompt_models import (
     IconCategoryEnum,
     IconQueryCollectionWithData,
 )
-from langchain_core.vectorstores import InMemoryVectorStore
 
 
 async def get_icon(
-    vector_store: InMemoryVectorStore,
     input: IconQueryCollectionWithData,
 ) -> str:
+    return (await get_icons_for_queries([input]))[0]
+
+
+async def get_icons_for_queries(
+    inputs: List[IconQueryCollectionWithData],
+) -> List[str]:
+    if not inputs:
+        return []
+
     try:
-        query = input.icon_query.queries[0]
-        results = vector_store.similarity_search(query=query, k=1)
-        icon_name = results[0].page_content
-        return get_resource(f"assets/icons/bold/{icon_name}.png")
+        icon_names = await asyncio.to_thread(
+            get_icons_index().search_batch,
+            [each.icon_query.queries for each in inputs],
+        )
     except Exception as e:
-        print("Error finding icon: ", e)
-        return get_resource("assets/icons/placeholder.png")
+        print("Error finding icons: ", e)
+        icon_names = [None] * len(inputs)
+
+    return [
+        (
+            get_resource(f"assets/icons/bold/{icon_name}.png")
+            if icon_name
+            else get_resource("assets/icons/placeholder.png")
+        )
+        for icon_name in icon_names
+    ]
 
 
 async def get_icons(
-    vector_store: InMemoryVectorStore,
     query: str,
     page: int,
     limit: int,
@@ -31,7 +48,6 @@ async def get_icons(
     temp_dir: str,
 ) -> List[str]:
 
-    results = await vector_store.asimilarity_search(query=query, k=limit)
-    icon_names = [result.page_content for result in results]
+    icon_names = await asyncio.to_thread(get_icons_index().search, query, limit)
 
     return [get_resource(f"assets/icons/bold/{each}.png") for each in icon_names]
@@ -1,37 +1,167 @@
 import json
 import os
-from langchain_core.vectorstores import InMemoryVectorStore
+import threading
+from typing import List, Optional
+
+import numpy as np
+from fastembed import TextEmbedding
 
-from langchain_core.documents import Document
 from api.utils import get_resource
-from langchain_community.embeddings.fastembed import FastEmbedEmbeddings
 
 # Pyinstaller
 import fastembed
 
+ICONS_EMBEDDING_MODEL = "BAAI/bge-small-en-v1.5"
+ICONS_DIRECTORY = "assets/icons/bold"
+ICONS_INDEX_EMBEDDINGS_PATH = "assets/icons_index.npy"
+ICONS_INDEX_NAMES_PATH = "assets/icons_index.json"
+# ? Score multiplier for every next fallback query of an icon
+ICON_FALLBACK_QUERY_WEIGHT = 0.9
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1
+    return (matrix / norms).astype(np.float32)
+
+
+def get_top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    k = max(1, min(k, scores.shape[-1]))
+    top_k = np.argpartition(-scores, k - 1)[:k]
+    return top_k[np.argsort(-scores[top_k])]
+
+
+class IconsIndex:
+
+    def __init__(
+        self,
+        embedding_model: TextEmbedding,
+        icon_names: List[str],
+        embeddings: np.ndarray,
+    ):
+        self._embedding_model = embedding_model
+        self._icon_names = icon_names
+        # ? Rows are L2 normalized, so dot product is cosine similarity
+        self._embeddings = embeddings
+
+    @property
+    def icon_names(self) -> List[str]:
+        return self._icon_names
+
+    def embed_queries(self, queries: List[str]) -> np.ndarray:
+        embeddings = np.array(
+            list(self._embedding_model.query_embed(queries)), dtype=np.float32
+        )
+        return normalize_rows(embeddings)
+
+    def search(self, query: str, k: int = 1) -> List[str]:
+        scores = self._embeddings @ self.embed_queries([query])[0]
+        return [self._icon_names[i] for i in get_top_k_indices(scores, k)]
+
+    def search_batch(self, query_groups: List[List[str]]) -> List[Optional[str]]:
+        queries = [query for group in query_groups for query in group]
+        if not queries:
+            return [None] * len(query_groups)
+
+        # ? Every query of every group is embedded and scored in one go
+        scores = self.embed_queries(queries) @ self._embeddings.T
+        weights = np.concatenate(
+            [
+                ICON_FALLBACK_QUERY_WEIGHT ** np.arange(len(group), dtype=np.float32)
+                for group in query_groups
+                if group
+            ]
+        )
+        scores *= weights[:, np.newaxis]
+
+        # ? Merges fallback queries of a group by taking their best weighted score
+        group_offsets = np.cumsum([0] + [len(group) for group in query_groups])[:-1]
+        non_empty_offsets = [
+            offset for offset, group in zip(group_offsets, query_groups) if group
+        ]
+        best_icons = np.maximum.reduceat(scores, non_empty_offsets, axis=0).argmax(
+            axis=1
+        )
+
+        best_icons = iter(best_icons)
+        return [
+            self._icon_names[next(best_icons)] if group else None
+            for group in query_groups
+        ]
+
+
+_embedding_model: Optional[TextEmbedding] = None
+_icons_index: Optional[IconsIndex] = None
+_icons_index_lock = threading.Lock()
+# ? Separate from index lock, as model is also loaded while index lock is held
+_embedding_model_lock = threading.Lock()
+
+
+def get_embedding_model() -> TextEmbedding:
+    global _embedding_model
+    if _embedding_model is not None:
+        return _embedding_model
+
+    with _embedding_model_lock:
+        if _embedding_model is None:
+            _embedding_model = TextEmbedding(model_name=ICONS_EMBEDDING_MODEL)
+        return _embedding_model
+
+
+def get_icon_names() -> List[str]:
+    icon_names = []
+    for each in os.listdir(get_resource(ICONS_DIRECTORY)):
+        name, extension = os.path.splitext(each)
+        if extension == ".png" and name.split("-")[-1] == "bold":
+            icon_names.append(name)
+    return sorted(icon_names)
+
+
+def build_icons_index() -> IconsIndex:
+    embedding_model = get_embedding_model()
+    icon_names = get_icon_names()
+
+    embeddings = normalize_rows(
+        np.array(list(embedding_model.embed(icon_names)), dtype=np.float32)
+    )
+
+    try:
+        np.save(get_resource(ICONS_INDEX_EMBEDDINGS_PATH), embeddings)
+        with open(get_resource(ICONS_INDEX_NAMES_PATH), "w") as f:
+            json.dump(icon_names, f)
+    except OSError as e:
+        print(f"Could not save icons index: {e}")
+
+    return IconsIndex(embedding_model, icon_names, embeddings)
+
+
+def load_icons_index() -> IconsIndex:
+    global _icons_index
+
+    with _icons_index_lock:
+        if _icons_index is not None:
+            return _icons_index
 
-def get_icons_vectorstore():
-    vector_store_path = get_resource("assets/icons_vectorstore.json")
+        embeddings_path = get_resource(ICONS_INDEX_EMBEDDINGS_PATH)
+        names_path = get_resource(ICONS_INDEX_NAMES_PATH)
 
-    embeddings = FastEmbedEmbeddings()
+        icons_index = None
+        if os.path.exists(embeddings_path) and os.path.exists(names_path):
+            with open(names_path, "r") as f:
+                icon_names = json.load(f)
+            embeddings = np.load(embeddings_path, mmap_mode="r")
 
-    if os.path.exists(vector_store_path):
-        vector_store = InMemoryVectorStore.load(vector_store_path, embeddings)
-        return vector_store
+            # ? Rebuilds index if icons have been added or removed
+            if icon_names == get_icon_names() and len(icon_names) == len(embeddings):
+                icons_index = IconsIndex(get_embedding_model(), icon_names, embeddings)
 
-    vector_store = InMemoryVectorStore(embeddings)
+        _icons_index = icons_index or build_icons_index()
+        return _icons_index
 
-    vector_store.dump(vector_store_path)
 
-    with open(get_resource("assets/icons.json"), "r") as f:
-        icons = json.load(f)
+def get_icons_index() -> IconsIndex:
+    return _icons_index or load_icons_index()
 
-    icon_names = [icon["name"] for icon in icons["icons"]]
-    documents = []
-    for each in icon_names:
-        if each.split("-")[-1] == "bold":
-            documents.append(Document(id=each, page_content=each))
 
-    vector_store.add_documents(documents)
-    vector_store.dump(vector_store_path)
-    return vector_store
+if __name__ == "__main__":
+    build_icons_index()
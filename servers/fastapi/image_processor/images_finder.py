@@ -1,32 +1,94 @@
 import asyncio
 import base64
+import hashlib
+import json
 import os
 import uuid
+from typing import Optional
 import aiohttp
-from langchain_google_genai import ChatGoogleGenerativeAI
-from openai import OpenAI
 
 from ppt_generator.models.query_and_prompt_models import (
     ImagePromptWithThemeAndAspectRatio,
 )
+from api.services.file_cache import link_or_copy_file
+from api.services.instances import (
+    generated_images_cache,
+    llm_client_registry,
+    llm_scheduler,
+)
 from api.utils import get_resource
 
+OPENAI_IMAGE_MODEL = "dall-e-3"
+GOOGLE_IMAGE_MODEL = "gemini-2.0-flash-preview-image-generation"
+
+
+def normalize_prompt(prompt: str) -> str:
+    return " ".join(prompt.split()).lower()
+
+
+def get_generated_image_cache_key(
+    input: ImagePromptWithThemeAndAspectRatio, provider: str, model: str
+) -> str:
+    key = json.dumps(
+        [
+            normalize_prompt(input.image_prompt),
+            normalize_prompt(input.theme_prompt),
+            input.aspect_ratio.value,
+            provider,
+            model,
+        ]
+    )
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def get_cached_image(cache_key: str, output_directory: str) -> Optional[str]:
+    cached_image_path = generated_images_cache.get(cache_key)
+    if not cached_image_path:
+        return None
+
+    image_path = os.path.join(
+        output_directory,
+        f"{str(uuid.uuid4())}{os.path.splitext(cached_image_path)[1]}",
+    )
+    try:
+        link_or_copy_file(cached_image_path, image_path)
+        return image_path
+    except OSError as e:
+        print(f"Error using cached image: {e}")
+        return None
+
 
 async def generate_image(
     input: ImagePromptWithThemeAndAspectRatio,
     output_directory: str,
 ) -> str:
     image_prompt = f"{input.image_prompt}, {input.theme_prompt}"
+
+    provider = os.getenv("LLM")
+    image_gen_func, model = (
+        (generate_image_openai, OPENAI_IMAGE_MODEL)
+        if provider == "openai"
+        else (generate_image_google, GOOGLE_IMAGE_MODEL)
+    )
+    cache_key = get_generated_image_cache_key(input, provider, model)
+
+    # ? Same prompt with same model is served from cache instead of generating again
+    # ? Cache is used in threads, as it touches files and might scan cache directory
+    image_path = await asyncio.to_thread(get_cached_image, cache_key, output_directory)
+    if image_path:
+        return image_path
+
     print(f"Request - Generating Image for {image_prompt}")
 
     try:
-        image_gen_func = (
-            generate_image_openai
-            if os.getenv("LLM") == "openai"
-            else generate_image_google
-        )
         image_path = await image_gen_func(image_prompt, output_directory)
         if image_path and os.path.exists(image_path):
+            try:
+                await asyncio.to_thread(
+                    generated_images_cache.put, cache_key, image_path
+                )
+            except OSError as e:
+                print(f"Error caching image: {e}")
             return image_path
         raise Exception(f"Image not found at {image_path}")
 
@@ -36,10 +98,9 @@ async def generate_image(
 
 
 async def generate_image_openai(prompt: str, output_directory: str) -> str:
-    client = OpenAI()
-    result = await asyncio.to_thread(
-        client.images.generate,
-        model="dall-e-3",
+    client = llm_client_registry.get_openai_client()
+    result = await client.images.generate(
+        model=OPENAI_IMAGE_MODEL,
         prompt=prompt,
         n=1,
         quality="standard",
@@ -56,9 +117,13 @@ async def generate_image_openai(prompt: str, output_directory: str) -> str:
 
 
 async def generate_image_google(prompt: str, output_directory: str) -> str:
-    response = await ChatGoogleGenerativeAI(
-        model="gemini-2.0-flash-preview-image-generation"
-    ).ainvoke([prompt], generation_config={"response_modalities": ["TEXT", "IMAGE"]})
+    model = llm_client_registry.get_chat_model("google", GOOGLE_IMAGE_MODEL)
+    response = await llm_scheduler.ainvoke(
+        model,
+        [prompt],
+        model,
+        generation_config={"response_modalities": ["TEXT", "IMAGE"]},
+    )
 
     image_block = next(
         block
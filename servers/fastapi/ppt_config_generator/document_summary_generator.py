@@ -1,13 +1,21 @@
 import asyncio
+from functools import partial
 import os
-from typing import List
+from typing import Callable, List, Optional
 from langchain_core.documents import Document
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_openai import ChatOpenAI
+from langchain_core.language_models import BaseChatModel
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.messages import BaseMessage
+from langchain_core.messages import AIMessage, BaseMessage
 from langchain_text_splitters import CharacterTextSplitter
 
+from api.services.instances import (
+    llm_client_registry,
+    llm_request_coalescer,
+    llm_response_cache,
+    llm_scheduler,
+)
+from api.services.llm_coalescer import get_llm_request_key
+
 sysmte_prompt = """
 Generate a blog-style summary of the provided document in **more than 2000 words**.
 Maintain as much information as possible.
@@ -32,22 +40,127 @@ prompt_template = ChatPromptTemplate.from_messages(
 )
 
 
-async def generate_document_summary(documents: List[Document]):
+chunk_summary_prompt = """
+Summarize the provided part of a document.
+Maintain as much information as possible, including key facts, numbers and names.
+
+### Notes
+
+- Preserve the **structure and logical flow** of the part.
+- Only output the summary.
+"""
+
+combine_summaries_prompt = """
+Combine the provided summaries of consecutive parts of a document into a single summary.
+Maintain as much information as possible, including key facts, numbers and names.
+
+### Notes
+
+- Preserve the **order and logical flow** of the summaries.
+- Only output the combined summary.
+"""
+
+chunk_summary_prompt_template = ChatPromptTemplate.from_messages(
+    [
+        ("system", chunk_summary_prompt),
+        ("user", "{text}"),
+    ]
+)
+
+combine_summaries_prompt_template = ChatPromptTemplate.from_messages(
+    [
+        ("system", combine_summaries_prompt),
+        ("user", "{text}"),
+    ]
+)
+
+
+async def get_summary(
+    model: BaseChatModel, template: ChatPromptTemplate, text: str
+) -> str:
+    input_dict = {"text": text}
+    key = get_llm_request_key(model, template.format_messages(**input_dict))
+    completion: BaseMessage = await llm_response_cache.run(
+        key,
+        AIMessage,
+        partial(
+            llm_request_coalescer.run,
+            key,
+            partial(llm_scheduler.ainvoke, template | model, input_dict, model),
+        ),
+    )
+    return completion.content
+
+
+def group_summaries(summaries: List[str], max_size: int) -> List[List[str]]:
+    # ? Every group has at least two summaries, so each level halves them at least
+    groups = [[]]
+    size = 0
+    for summary in summaries:
+        if len(groups[-1]) > 1 and size + len(summary) > max_size:
+            groups.append([])
+            size = 0
+        groups[-1].append(summary)
+        size += len(summary)
+    # ? Single trailing summary is combined with previous group
+    if len(groups) > 1 and len(groups[-1]) == 1:
+        groups[-2].extend(groups.pop())
+    return groups
+
+
+async def generate_document_summary(
+    documents: List[Document],
+    on_progress: Optional[Callable[[int, int], None]] = None,
+):
     model = (
-        ChatOpenAI(model="gpt-4.1-nano", max_completion_tokens=8000)
+        llm_client_registry.get_chat_model(
+            "openai", "gpt-4.1-nano", max_completion_tokens=8000
+        )
         if os.getenv("LLM") == "openai"
-        else ChatGoogleGenerativeAI(model="gemini-2.0-flash", max_output_tokens=8000)
+        else llm_client_registry.get_chat_model(
+            "google", "gemini-2.0-flash", max_output_tokens=8000
+        )
+    )
+    chunk_size = int(os.getenv("DOCUMENT_SUMMARY_CHUNK_SIZE") or 50000)
+    text_splitter = CharacterTextSplitter(
+        separator="\n", chunk_size=chunk_size, chunk_overlap=0
     )
-    text_splitter = CharacterTextSplitter(chunk_size=200000, chunk_overlap=0)
-    chain = prompt_template | model
-
-    coroutines = []
-    for document in documents:
-        text = document.page_content
-        truncated_text = text_splitter.split_text(text)[0]
-        coroutine = chain.ainvoke({"text": truncated_text})
-        coroutines.append(coroutine)
-
-    completions: List[BaseMessage] = await asyncio.gather(*coroutines)
-    combined = "\n\n\n\n".join([completion.content for completion in completions])
-    return combined
+    semaphore = asyncio.Semaphore(int(os.getenv("DOCUMENT_SUMMARY_CONCURRENCY") or 8))
+
+    # ? Total grows as reduce levels of larger documents are planned
+    progress = {"completed": 0, "total": 0}
+
+    async def summarize(template: ChatPromptTemplate, text: str) -> str:
+        async with semaphore:
+            summary = await get_summary(model, template, text)
+        progress["completed"] += 1
+        if on_progress:
+            on_progress(progress["completed"], progress["total"])
+        return summary
+
+    async def summarize_document(document: Document) -> str:
+        chunks = text_splitter.split_text(document.page_content) or [""]
+        progress["total"] += len(chunks)
+        if len(chunks) == 1:
+            return await summarize(prompt_template, chunks[0])
+
+        # ? Chunks are summarized concurrently and their summaries are reduced
+        # ? level by level until they fit in the final summary request
+        summaries = await asyncio.gather(
+            *[summarize(chunk_summary_prompt_template, each) for each in chunks]
+        )
+        while len(summaries) > 1 and sum(map(len, summaries)) > chunk_size:
+            groups = group_summaries(summaries, chunk_size)
+            progress["total"] += len(groups)
+            summaries = await asyncio.gather(
+                *[
+                    summarize(combine_summaries_prompt_template, "\n\n".join(each))
+                    for each in groups
+                ]
+            )
+
+        progress["total"] += 1
+        return await summarize(prompt_template, "\n\n".join(summaries))
+
+    summaries = await asyncio.gather(*[summarize_document(each) for each in documents])
+    return "\n\n\n\n".join(summaries)
@@ -1,9 +1,12 @@
 import os
 from typing import Optional
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_openai import ChatOpenAI
-
+from api.services.instances import (
+    llm_client_registry,
+    llm_request_coalescer,
+    llm_response_cache,
+)
+from api.services.llm_coalescer import get_llm_request_key
 from ppt_config_generator.models import PresentationMarkdownModel
 from ppt_generator.fix_validation_errors import get_validated_response
 
@@ -63,23 +66,34 @@ async def generate_ppt_content(
     content: Optional[str] = None,
 ) -> PresentationMarkdownModel:
     model = (
-        ChatOpenAI(model="gpt-4.1")
+        llm_client_registry.get_chat_model("openai", "gpt-4.1")
         if os.getenv("LLM") == "openai"
-        else ChatGoogleGenerativeAI(model="gemini-2.0-flash")
+        else llm_client_registry.get_chat_model("google", "gemini-2.0-flash")
     )
 
-    chain = get_prompt_template() | model.with_structured_output(
-        PresentationMarkdownModel.model_json_schema()
+    prompt_template = get_prompt_template()
+    schema = PresentationMarkdownModel.model_json_schema()
+    chain = prompt_template | model.with_structured_output(schema)
+    input_dict = {
+        "prompt": prompt,
+        "n_slides": n_slides,
+        "language": language or "English",
+        "content": content,
+    }
+
+    key = get_llm_request_key(
+        model, prompt_template.format_messages(**input_dict), schema
     )
 
-    response = await get_validated_response(
-        chain,
-        {
-            "prompt": prompt,
-            "n_slides": n_slides,
-            "language": language or "English",
-            "content": content,
-        },
+    # ? Stored responses are reused and identical requests in progress are awaited
+    response = await llm_response_cache.run(
+        key,
         PresentationMarkdownModel,
+        lambda: llm_request_coalescer.run(
+            key,
+            lambda: get_validated_response(
+                chain, input_dict, PresentationMarkdownModel, model
+            ),
+        ),
     )
     return response
@@ -1,10 +1,16 @@
 import os
 from fastapi import HTTPException
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_openai import ChatOpenAI
+from api.services.instances import llm_client_registry, llm_scheduler
+from api.services.llm_scheduler import LLMPriority
+from langchain_core.language_models import BaseChatModel
 from langchain_core.prompts import ChatPromptTemplate
 from pydantic import BaseModel, ValidationError
 
+from ppt_generator.validation_repair import repair_response
+
+# ? Number of responses fixed locally, fixed by LLM and not fixed at all
+validation_fixes = {"local": 0, "llm": 0, "failed": 0}
+
 
 def get_prompt_template():
     return ChatPromptTemplate(
@@ -37,23 +43,37 @@ def get_prompt_template():
     )
 
 
-async def fix_validation_errors(response_model: BaseModel, response, errors):
+async def fix_validation_errors(
+    response_model: BaseModel,
+    response,
+    errors,
+    priority: LLMPriority = LLMPriority.BATCH,
+):
     model = (
-        ChatOpenAI(model="o3-mini", reasoning_effort="high")
+        llm_client_registry.get_chat_model("openai", "o3-mini", reasoning_effort="high")
         if os.getenv("LLM") == "openai"
-        else ChatGoogleGenerativeAI(model="gemini-2.5-flash-preview-04-17")
+        else llm_client_registry.get_chat_model(
+            "google", "gemini-2.5-flash-preview-04-17"
+        )
     )
 
     chain = get_prompt_template() | model.with_structured_output(
         response_model.model_json_schema()
     )
-    return await chain.ainvoke({"input": response, "errors": errors})
+    return await llm_scheduler.ainvoke(
+        chain, {"input": response, "errors": errors}, model, priority
+    )
 
 
 async def get_validated_response(
-    chain, input_dict, response_model: BaseModel, retries: int = 1
+    chain,
+    input_dict,
+    response_model: BaseModel,
+    model: BaseChatModel,
+    retries: int = 1,
+    priority: LLMPriority = LLMPriority.BATCH,
 ):
-    response = await chain.ainvoke(input_dict)
+    response = await llm_scheduler.ainvoke(chain, input_dict, model, priority)
 
     attempt = 0
     while retries >= attempt:
@@ -63,8 +83,17 @@ async def get_validated_response(
                 response = response[0]["args"]
 
             validated_response = response_model(**response)
+            # ? Only responses validated after LLM fixed them are counted
+            if attempt > 1:
+                validation_fixes["llm"] += 1
             return validated_response
         except ValidationError as e:
+            # ? Mechanical errors are repaired without asking LLM to fix them
+            repaired_response = repair_response(response_model, response)
+            if repaired_response:
+                validation_fixes["local"] += 1
+                return repaired_response
+
             if retries < attempt:
                 break
 
@@ -80,7 +109,8 @@ async def get_validated_response(
 
             print(f"Validation Retry attempt - {attempt}")
             response = await fix_validation_errors(
-                response_model, response, error_details
+                response_model, response, error_details, priority
             )
 
+    validation_fixes["failed"] += 1
     raise HTTPException(status_code=400, detail="Error while validating response")
@@ -1,8 +1,14 @@
+import asyncio
+import json
 import os
 from typing import AsyncIterator, List, Optional
 
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_openai import ChatOpenAI
+from api.services.instances import (
+    llm_client_registry,
+    llm_request_coalescer,
+    llm_scheduler,
+)
+from api.services.llm_coalescer import get_llm_request_key
 from langchain_core.messages import (
     SystemMessage,
     HumanMessage,
@@ -10,16 +16,16 @@ from langchain_core.messages import (
     AIMessage,
 )
 from ppt_config_generator.models import SlideMarkdownModel
-from ppt_generator.models.llm_models import LLMPresentationModel
-
-CREATE_PRESENTATION_PROMPT = """
-                You're a professional presenter with years of experience in creating clear and engaging presentations. 
-
-                Create a presentation using the provided title, slide titles and body following specified steps and guidelines. 
-
-                Analyze all inputs, to construct each slide with appropriate content and format.
-
+from ppt_generator.fix_validation_errors import get_validated_response
+from ppt_generator.models.llm_models import (
+    LLM_CONTENT_TYPE_MAPPING,
+    LLMPresentationModel,
+    LLMSlideContentModel,
+    LLMSlideTypesModel,
+)
+from ppt_generator.models.other_models import SlideType
 
+SLIDE_TYPES_PROMPT = """\
                 # Slide Types
                 - **1**: contains title, description and image.
                 - **2**: contains title and list of items.
@@ -27,25 +33,9 @@ CREATE_PRESENTATION_PROMPT = """
                 - **5**: contains title, description and a graph.
                 - **6**: contains title, description and list of items.
                 - **7**: contains title and list of items with icons.
-                - **8**: contains title, description and list of items with icons.
+                - **8**: contains title, description and list of items with icons."""
 
-                # Steps
-                1. Analyze provided presentation title, slide titles and body.
-                2. Select slide type for each slide.
-                3. Output should be in json format as per given schema.
-                4. **Adherence to schema should be beyond all the rules mentioned in notes.**
-
-                # Notes
-                - Generate output in language mentioned in *Input*.
-                - Freely select type with images and icons.
-                - Introduction and Conclusion should have *Type 1* if graph is not assigned.
-                - Try to select **different types for every slides**.
-                - Don't select Type **3** for any slide.
-                - Do not include same graph twice in presentation without any changes to the other.
-                - Every series in a graph should have data in same unit. Example: all series should be in percentage or all series should be in number of items.
-                - Type **9** and **5** should be only picked if graph is available.
-                - **Strictly keep the text under given limit.**
-                - For slide content follow these rules:
+SLIDE_CONTENT_RULES_PROMPT = """\
                     - Highlighting in markdown format should be used to emphasize numbers and data.
                     - Adhere to length contraints in **body** and **description**. Focus on direct communication within character constrainsts than lengthy explanation.
                     - **body** and **description** in slides should never exceed character limits of 200 characters.
@@ -64,38 +54,123 @@ CREATE_PRESENTATION_PROMPT = """
                     - Provide 3 icon query for each icon where,
                         - First one should be specific like "Led bulb".
                         - Second one should be more generic that first like "bulb".
-                        - Third one should be simplest like "light".
+                        - Third one should be simplest like "light"."""
+
+CREATE_PRESENTATION_PROMPT = f"""
+                You're a professional presenter with years of experience in creating clear and engaging presentations. 
+
+                Create a presentation using the provided title, slide titles and body following specified steps and guidelines. 
+
+                Analyze all inputs, to construct each slide with appropriate content and format.
+
+
+{SLIDE_TYPES_PROMPT}
+
+                # Steps
+                1. Analyze provided presentation title, slide titles and body.
+                2. Select slide type for each slide.
+                3. Output should be in json format as per given schema.
+                4. **Adherence to schema should be beyond all the rules mentioned in notes.**
+
+                # Notes
+                - Generate output in language mentioned in *Input*.
+                - Freely select type with images and icons.
+                - Introduction and Conclusion should have *Type 1* if graph is not assigned.
+                - Try to select **different types for every slides**.
+                - Don't select Type **3** for any slide.
+                - Do not include same graph twice in presentation without any changes to the other.
+                - Every series in a graph should have data in same unit. Example: all series should be in percentage or all series should be in number of items.
+                - Type **9** and **5** should be only picked if graph is available.
+                - **Strictly keep the text under given limit.**
+                - Use **Document Excerpts** of a slide to ground its content if they are provided.
+                - For slide content follow these rules:
+{SLIDE_CONTENT_RULES_PROMPT}
 
                 **Follow the all the length constraints provided in the schema and notes.**
                 **Go through notes and steps and make sure they are all followed. Rule breaks are strictly not allowed.**
 """
 
+SELECT_SLIDE_TYPES_PROMPT = f"""
+                Select type of every slide of the presentation using the provided title, slide titles and body.
 
-def get_model_and_messages(
-    title: str, notes: Optional[List[str]], outlines: List[SlideMarkdownModel]
-):
-    schema = LLMPresentationModel.model_json_schema()
+{SLIDE_TYPES_PROMPT}
 
-    system_prompt = f"{CREATE_PRESENTATION_PROMPT} -|0|--|0|- Follow this schema while giving out response: {schema}. Make description short and obey the character limits. Output should be in JSON format. Give out only JSON, nothing else."
-    system_prompt = SystemMessage(system_prompt.replace("-|0|-", "\n"))
+                # Notes
+                - Select exactly one type for every slide in the same order as slides.
+                - Freely select type with images and icons.
+                - Introduction and Conclusion should have *Type 1* if graph is not assigned.
+                - Try to select **different types for every slides**.
+                - Don't select Type **3** for any slide.
+                - Type **9** and **5** should be only picked if graph is available.
+"""
+
+CREATE_SLIDE_CONTENT_PROMPT = f"""
+                You're a professional presenter with years of experience in creating clear and engaging presentations.
+
+                Create content of a single slide of the presentation using the provided presentation title, slide titles, and title and body of the slide.
+
+                # Notes
+                - Generate output in language mentioned in *Input*.
+                - Every series in a graph should have data in same unit. Example: all series should be in percentage or all series should be in number of items.
+                - **Strictly keep the text under given limit.**
+                - Use **Document Excerpts** of the slide to ground its content if they are provided.
+                - For slide content follow these rules:
+{SLIDE_CONTENT_RULES_PROMPT}
+"""
+
+
+def get_slide_excerpts_message(excerpts: Optional[List[str]]) -> str:
+    if not excerpts:
+        return ""
+    message = "  - Document Excerpts: \n"
+    for excerpt in excerpts:
+        message += f"    - {' '.join(excerpt.split())} \n"
+    return message
 
+
+def get_presentation_user_message(
+    title: str,
+    notes: Optional[List[str]],
+    outlines: List[SlideMarkdownModel],
+    slides_excerpts: Optional[List[List[str]]] = None,
+) -> HumanMessage:
     user_message = f"# Presentation Title: {title} \n\n"
     for i, slide in enumerate(outlines):
         user_message += f"## Slide {i+1}:\n"
         user_message += f"  - Title: {slide.title} \n"
-        user_message += f"  - Body: {slide.body} \n\n"
+        user_message += f"  - Body: {slide.body} \n"
+        user_message += get_slide_excerpts_message(
+            slides_excerpts[i] if slides_excerpts else None
+        )
+        user_message += "\n"
 
     if notes:
         user_message += f"# Notes: \n"
         for note in notes:
             user_message += f"  - {note} \n"
 
-    user_message = HumanMessage(user_message)
+    return HumanMessage(user_message)
+
+
+def get_model_and_messages(
+    title: str,
+    notes: Optional[List[str]],
+    outlines: List[SlideMarkdownModel],
+    slides_excerpts: Optional[List[List[str]]] = None,
+):
+    schema = LLMPresentationModel.model_json_schema()
+
+    system_prompt = f"{CREATE_PRESENTATION_PROMPT} -|0|--|0|- Follow this schema while giving out response: {schema}. Make description short and obey the character limits. Output should be in JSON format. Give out only JSON, nothing else."
+    system_prompt = SystemMessage(system_prompt.replace("-|0|-", "\n"))
+
+    user_message = get_presentation_user_message(
+        title, notes, outlines, slides_excerpts
+    )
 
     model = (
-        ChatOpenAI(model="gpt-4.1")
+        llm_client_registry.get_chat_model("openai", "gpt-4.1")
         if os.getenv("LLM") == "openai"
-        else ChatGoogleGenerativeAI(model="gemini-2.0-flash")
+        else llm_client_registry.get_chat_model("google", "gemini-2.0-flash")
     )
 
     return model, system_prompt, user_message
@@ -105,16 +180,163 @@ def generate_presentation_stream(
     title: str,
     notes: Optional[List[str]],
     outlines: List[SlideMarkdownModel],
+    slides_excerpts: Optional[List[List[str]]] = None,
 ) -> AsyncIterator[AIMessageChunk]:
-    model, system_prompt, user_message = get_model_and_messages(title, notes, outlines)
+    if os.getenv("PRESENTATION_GENERATION_MODE") == "fan_out":
+        return generate_presentation_fan_out_stream(
+            title, notes, outlines, slides_excerpts
+        )
 
-    return model.astream([system_prompt, user_message])
+    model, system_prompt, user_message = get_model_and_messages(
+        title, notes, outlines, slides_excerpts
+    )
+    messages = [system_prompt, user_message]
+
+    # ? Chunks of identical stream already in progress are shared
+    return llm_request_coalescer.stream(
+        get_llm_request_key(model, messages),
+        lambda: llm_scheduler.astream(model, messages, model),
+    )
 
 
 async def generate_presentation(
     title: str,
     notes: Optional[List[str]],
     outlines: List[SlideMarkdownModel],
+    slides_excerpts: Optional[List[List[str]]] = None,
 ) -> AIMessage:
-    model, system_prompt, user_message = get_model_and_messages(title, notes, outlines)
-    return await model.ainvoke([system_prompt, user_message])
+    if os.getenv("PRESENTATION_GENERATION_MODE") == "fan_out":
+        chunks = generate_presentation_fan_out_stream(
+            title, notes, outlines, slides_excerpts
+        )
+        return AIMessage("".join([each.content async for each in chunks]))
+
+    model, system_prompt, user_message = get_model_and_messages(
+        title, notes, outlines, slides_excerpts
+    )
+    messages = [system_prompt, user_message]
+
+    return await llm_request_coalescer.run(
+        get_llm_request_key(model, messages),
+        lambda: llm_scheduler.ainvoke(model, messages, model),
+    )
+
+
+async def get_slide_types(
+    title: str,
+    notes: Optional[List[str]],
+    outlines: List[SlideMarkdownModel],
+) -> List[SlideType]:
+    model = (
+        llm_client_registry.get_chat_model("openai", "gpt-4.1-mini")
+        if os.getenv("LLM") == "openai"
+        else llm_client_registry.get_chat_model("google", "gemini-2.0-flash")
+    )
+
+    schema = LLMSlideTypesModel.model_json_schema()
+    messages = [
+        SystemMessage(SELECT_SLIDE_TYPES_PROMPT),
+        get_presentation_user_message(title, notes, outlines),
+    ]
+    response = await llm_request_coalescer.run(
+        get_llm_request_key(model, messages, schema),
+        lambda: get_validated_response(
+            model.with_structured_output(schema), messages, LLMSlideTypesModel, model
+        ),
+    )
+
+    # ? Slides without selected type fall back to type 1
+    slide_types = response.slide_types[: len(outlines)]
+    return slide_types + [SlideType.type1] * (len(outlines) - len(slide_types))
+
+
+async def generate_slide_content(
+    title: str,
+    notes: Optional[List[str]],
+    outlines: List[SlideMarkdownModel],
+    index: int,
+    slide_type: SlideType,
+    excerpts: Optional[List[str]] = None,
+) -> LLMSlideContentModel:
+    model = (
+        llm_client_registry.get_chat_model("openai", "gpt-4.1")
+        if os.getenv("LLM") == "openai"
+        else llm_client_registry.get_chat_model("google", "gemini-2.0-flash")
+    )
+
+    content_model = LLM_CONTENT_TYPE_MAPPING[slide_type]
+    schema = content_model.model_json_schema()
+
+    user_message = f"# Presentation Title: {title} \n\n"
+    user_message += "# Slide Titles: \n"
+    for i, slide in enumerate(outlines):
+        user_message += f"  {i+1}. {slide.title} \n"
+    user_message += f"\n# Slide {index+1}:\n"
+    user_message += f"  - Title: {outlines[index].title} \n"
+    user_message += f"  - Body: {outlines[index].body} \n"
+    user_message += get_slide_excerpts_message(excerpts)
+    user_message += "\n"
+
+    if notes:
+        user_message += f"# Notes: \n"
+        for note in notes:
+            user_message += f"  - {note} \n"
+
+    messages = [
+        SystemMessage(CREATE_SLIDE_CONTENT_PROMPT + content_model.get_notes()),
+        HumanMessage(user_message),
+    ]
+    return await llm_request_coalescer.run(
+        get_llm_request_key(model, messages, schema),
+        lambda: get_validated_response(
+            model.with_structured_output(schema), messages, content_model, model
+        ),
+    )
+
+
+async def generate_presentation_fan_out_stream(
+    title: str,
+    notes: Optional[List[str]],
+    outlines: List[SlideMarkdownModel],
+    slides_excerpts: Optional[List[List[str]]] = None,
+) -> AsyncIterator[AIMessageChunk]:
+    slide_types = await get_slide_types(title, notes, outlines)
+
+    # ? Content of every slide is generated concurrently and streamed in order
+    # ? as JSON of LLMPresentationModel, same as single response generation
+    semaphore = asyncio.Semaphore(int(os.getenv("SLIDES_GENERATION_CONCURRENCY") or 8))
+
+    async def generate(index: int, slide_type: SlideType):
+        async with semaphore:
+            return await generate_slide_content(
+                title,
+                notes,
+                outlines,
+                index,
+                slide_type,
+                slides_excerpts[index] if slides_excerpts else None,
+            )
+
+    slides_generations = [
+        asyncio.create_task(generate(index, slide_type))
+        for index, slide_type in enumerate(slide_types)
+    ]
+    try:
+        presentation = {
+            "title": title,
+            "n_slides": len(outlines),
+            "titles": [each.title for each in outlines],
+        }
+        yield AIMessageChunk(json.dumps(presentation)[:-1] + ', "slides": [')
+
+        for index, slide_type in enumerate(slide_types):
+            content = await slides_generations[index]
+            slide = json.dumps(
+                {"type": slide_type.value, "content": content.model_dump(mode="json")}
+            )
+            yield AIMessageChunk(slide if index == 0 else f", {slide}")
+
+        yield AIMessageChunk("]}")
+    finally:
+        for each in slides_generations:
+            each.cancel()
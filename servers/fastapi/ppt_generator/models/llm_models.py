@@ -229,3 +229,9 @@ class LLMPresentationModel(BaseModel):
     n_slides: int
     titles: list[str]
     slides: list[LLMSlideModel]
+
+
+class LLMSlideTypesModel(BaseModel):
+    slide_types: List[SlideType] = Field(
+        description="Type of every slide in the same order as slides"
+    )
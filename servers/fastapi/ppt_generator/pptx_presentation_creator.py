@@ -1,8 +1,15 @@
+import base64
+import hashlib
+import json
 import os
-from typing import List, Optional
+from functools import partial
+from io import BytesIO
+from typing import IO, Dict, List, Optional, Tuple, Union
 import uuid
+import zipfile
 from lxml import etree
 
+import pptx
 from pptx import Presentation
 from pptx.shapes.autoshape import Shape
 from pptx.slide import Slide
@@ -15,8 +22,10 @@ from pptx.enum.chart import (
     XL_LABEL_POSITION,
 )
 from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.serialized import PackageWriter, _ZipPkgWriter
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import qn
 from lxml.etree import fromstring, tostring
-from PIL import Image
 
 from pptx.util import Pt
 from graph_processor.models import (
@@ -29,7 +38,6 @@ from graph_processor.models import (
 from pptx.dml.color import RGBColor
 from ppt_generator.models.pptx_models import (
     PptxAutoShapeBoxModel,
-    PptxBoxShapeEnum,
     PptxConnectorModel,
     PptxFillModel,
     PptxFontModel,
@@ -46,20 +54,85 @@ from ppt_generator.models.pptx_models import (
     PptxTextRunModel,
 )
 from ppt_generator.utils import (
-    clip_image,
-    fit_image,
-    round_image_corners,
-    create_circle_image,
-    change_image_color,
+    PICTURE_TRANSFORM_VERSION,
+    get_picture_cache_key,
+    picture_needs_transform,
+    tokenize_markdown_line,
+    transform_picture,
 )
+from api.services.file_cache import (
+    FileCacheService,
+    get_file_hash,
+    link_or_copy_file,
+)
+from api.services.process_pool import ProcessPoolService
 
 BLANK_SLIDE_LAYOUT = 6
+# ? Change this whenever slide rendering changes to invalidate cached slides
+SLIDE_CACHE_VERSION = 1
+
+
+class CompressedZipPkgWriter(_ZipPkgWriter):
+
+    def __init__(self, pkg_file: Union[str, IO[bytes]], compression_level: int):
+        super().__init__(pkg_file)
+        self._compression_level = compression_level
+
+    def write(self, pack_uri, blob: bytes):
+        # ? Media is already compressed, so it is stored and only xml parts are deflated
+        is_media = pack_uri.membername.startswith("ppt/media/")
+        self._zipf.writestr(
+            pack_uri.membername,
+            blob,
+            compress_type=zipfile.ZIP_STORED if is_media else zipfile.ZIP_DEFLATED,
+            compresslevel=None if is_media else self._compression_level,
+        )
+
+
+class CompressedPackageWriter(PackageWriter):
+
+    def __init__(self, pkg_file, pkg_rels, parts, compression_level: int):
+        super().__init__(pkg_file, pkg_rels, parts)
+        self._compression_level = compression_level
+
+    def _write(self):
+        with CompressedZipPkgWriter(
+            self._pkg_file, self._compression_level
+        ) as phys_writer:
+            self._write_content_types_stream(phys_writer)
+            self._write_pkg_rels(phys_writer)
+            self._write_parts(phys_writer)
+
+
+def replace_element_contents(element, new_element):
+    element.attrib.clear()
+    element.attrib.update(new_element.attrib)
+    element[:] = list(new_element)
 
 
 class PptxPresentationCreator:
 
-    def __init__(self, ppt_model: PptxPresentationModel, temp_dir: str):
+    def __init__(
+        self,
+        ppt_model: PptxPresentationModel,
+        temp_dir: str,
+        pictures_cache: Optional[FileCacheService] = None,
+        pictures_process_pool: Optional[ProcessPoolService] = None,
+        target_dpi: Optional[int] = None,
+        jpeg_quality: Optional[int] = None,
+        slides_cache: Optional[FileCacheService] = None,
+    ):
         self._temp_dir = temp_dir
+        self._slides_cache = slides_cache
+        self._target_dpi = target_dpi
+        self._jpeg_quality = jpeg_quality
+        self._pictures_cache = pictures_cache
+        self._pictures_process_pool = pictures_process_pool
+        # ? Transformed picture paths by id of picture model
+        self._transformed_pictures: Dict[int, Optional[str]] = {}
+        self._font_variants: Dict[
+            Tuple[int, bool, bool], Tuple[PptxFontModel, PptxFontModel]
+        ] = {}
 
         self._ppt_model = ppt_model
         self._slide_models = ppt_model.slides
@@ -75,12 +148,131 @@ class PptxPresentationCreator:
     def create_ppt(self):
         # self.set_presentation_theme()
 
-        for slide_model in self._slide_models:
+        # ? Slides unchanged since a previous export are spliced from cache
+        slide_fingerprints = [
+            self.get_slide_fingerprint(each) for each in self._slide_models
+        ]
+        cached_slides = [
+            self._slides_cache.get(each) if each else None
+            for each in slide_fingerprints
+        ]
+
+        self.transform_pictures(
+            [
+                slide_model
+                for slide_model, cached_slide in zip(self._slide_models, cached_slides)
+                if not cached_slide
+            ]
+        )
+
+        for slide_model, fingerprint, cached_slide in zip(
+            self._slide_models, slide_fingerprints, cached_slides
+        ):
+            if cached_slide and self.add_cached_slide(cached_slide):
+                continue
+
             # Adding global shapes to slide
             if self._ppt_model.shapes:
                 slide_model.shapes.append(self._ppt_model.shapes)
 
-            self.add_and_populate_slide(slide_model)
+            slide = self.add_and_populate_slide(slide_model)
+            if fingerprint:
+                self.cache_slide(slide, fingerprint)
+
+    def get_slide_fingerprint(self, slide_model: PptxSlideModel) -> Optional[str]:
+        if not self._slides_cache or self._ppt_model.shapes:
+            return None
+
+        shapes = []
+        for shape_model in slide_model.shapes:
+            # ? Charts are stored in their own parts, so they are always created
+            if isinstance(shape_model, PptxGraphBoxModel):
+                return None
+
+            shape_json = shape_model.model_dump(mode="json")
+            if isinstance(shape_model, PptxPictureBoxModel):
+                try:
+                    shape_json["picture"]["path"] = get_file_hash(
+                        shape_model.picture.path
+                    )
+                except OSError:
+                    return None
+            shapes.append([type(shape_model).__name__, shape_json])
+
+        key = json.dumps(
+            [
+                SLIDE_CACHE_VERSION,
+                PICTURE_TRANSFORM_VERSION,
+                pptx.__version__,
+                self._ppt_model.background_color,
+                self._target_dpi,
+                self._jpeg_quality,
+                shapes,
+            ]
+        )
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def cache_slide(self, slide: Slide, fingerprint: str):
+        images = {}
+        for rId, relationship in slide.part.rels.items():
+            if relationship.reltype == RT.IMAGE:
+                images[rId] = base64.b64encode(relationship.target_part.blob).decode(
+                    "utf-8"
+                )
+            elif relationship.reltype != RT.SLIDE_LAYOUT:
+                return
+
+        slide_path = os.path.join(self._temp_dir, f"{str(uuid.uuid4())}.json")
+        try:
+            with open(slide_path, "w") as f:
+                json.dump(
+                    {"xml": tostring(slide._element).decode("utf-8"), "images": images},
+                    f,
+                )
+            self._slides_cache.put(fingerprint, slide_path)
+        except OSError as e:
+            print(f"Could not cache slide: {e}")
+
+    def add_cached_slide(self, cached_slide_path: str) -> bool:
+        try:
+            with open(cached_slide_path, "r") as f:
+                cached_slide = json.load(f)
+            slide_element = parse_xml(cached_slide["xml"].encode("utf-8"))
+        except Exception as e:
+            print(f"Could not load cached slide: {e}")
+            return False
+
+        slide = self._ppt.slides.add_slide(self._ppt.slide_layouts[BLANK_SLIDE_LAYOUT])
+
+        # ? Images are related to the new slide and their references are remapped
+        rIds = {}
+        for rId, image in cached_slide["images"].items():
+            _, rIds[rId] = slide.part.get_or_add_image_part(
+                BytesIO(base64.b64decode(image))
+            )
+        for element in slide_element.iter():
+            for attribute in (qn("r:embed"), qn("r:link")):
+                if element.get(attribute) in rIds:
+                    element.set(attribute, rIds[element.get(attribute)])
+
+        self.replace_slide_element(slide, slide_element)
+        return True
+
+    def replace_slide_element(self, slide: Slide, slide_element):
+        # ? Slide, its shapes and background keep references to the slide, common
+        # ? slide data and shape tree elements, so only their contents are replaced
+        element = slide.part._element
+        c_sld = element.cSld
+        sp_tree = c_sld.spTree
+
+        new_c_sld = slide_element.cSld
+        new_sp_tree = new_c_sld.spTree
+
+        replace_element_contents(sp_tree, new_sp_tree)
+        new_c_sld.replace(new_sp_tree, sp_tree)
+        replace_element_contents(c_sld, new_c_sld)
+        slide_element.replace(new_c_sld, c_sld)
+        replace_element_contents(element, slide_element)
 
     def set_presentation_theme(self):
         slide_master = self._ppt.slide_master
@@ -102,7 +294,7 @@ class PptxPresentationCreator:
 
         theme_part._blob = tostring(theme)
 
-    def add_and_populate_slide(self, slide_model: PptxSlideModel):
+    def add_and_populate_slide(self, slide_model: PptxSlideModel) -> Slide:
         slide = self._ppt.slides.add_slide(self._ppt.slide_layouts[BLANK_SLIDE_LAYOUT])
 
         if self._slide_fill:
@@ -130,6 +322,8 @@ class PptxPresentationCreator:
         # Adding watermark
         # self.add_picture(slide, self.get_watermark_box_model())
 
+        return slide
+
     def add_connector(self, slide: Slide, connector_model: PptxConnectorModel):
         if connector_model.thickness == 0:
             return
@@ -261,51 +455,113 @@ class PptxPresentationCreator:
 
     def add_picture(self, slide: Slide, picture_model: PptxPictureBoxModel):
         image_path = picture_model.picture.path
-        if (
-            picture_model.clip
-            or picture_model.border_radius
-            or picture_model.overlay
-            or picture_model.object_fit
-            or picture_model.shape
+        if picture_needs_transform(
+            picture_model, self._target_dpi, self._jpeg_quality
         ):
-            try:
-                image = Image.open(image_path)
-            except:
-                print(f"Could not open image: {image_path}")
+            image_path = self.get_transformed_picture(picture_model)
+            if not image_path:
                 return
 
-            image = image.convert("RGBA")
-            # ? Applying border radius twice to support both clip and object fit
-            if picture_model.border_radius:
-                image = round_image_corners(image, picture_model.border_radius)
-            if picture_model.object_fit:
-                image = fit_image(
-                    image,
-                    picture_model.position.width,
-                    picture_model.position.height,
-                    picture_model.object_fit,
-                )
-            elif picture_model.clip:
-                image = clip_image(
-                    image,
-                    picture_model.position.width,
-                    picture_model.position.height,
-                )
-            if picture_model.border_radius:
-                image = round_image_corners(image, picture_model.border_radius)
-            if picture_model.shape == PptxBoxShapeEnum.CIRCLE:
-                image = create_circle_image(image)
-            if picture_model.overlay:
-                image = change_image_color(image, picture_model.overlay)
-            image_path = os.path.join(self._temp_dir, f"{str(uuid.uuid4())}.png")
-            image.save(image_path)
-
         margined_position = self.get_margined_position(
             picture_model.position, picture_model.margin
         )
 
         slide.shapes.add_picture(image_path, *margined_position.to_pt_list())
 
+    def get_picture_cache_key(
+        self, picture_model: PptxPictureBoxModel
+    ) -> Optional[str]:
+        if not self._pictures_cache:
+            return None
+        try:
+            return get_picture_cache_key(
+                picture_model, self._target_dpi, self._jpeg_quality
+            )
+        except OSError:
+            # ? Missing images are reported by transform_picture
+            return None
+
+    def transform_pictures(self, slide_models: List[PptxSlideModel]):
+        picture_models = [
+            each
+            for slide_model in slide_models
+            for each in slide_model.shapes
+            if isinstance(each, PptxPictureBoxModel)
+            and picture_needs_transform(each, self._target_dpi, self._jpeg_quality)
+        ]
+
+        # ? Pictures transformed in previous exports are embedded without any processing
+        pending_pictures: Dict[str, List[PptxPictureBoxModel]] = {}
+        for each in picture_models:
+            cache_key = self.get_picture_cache_key(each)
+            if not cache_key:
+                pending_pictures[str(uuid.uuid4())] = [each]
+                continue
+            if cache_key in pending_pictures:
+                pending_pictures[cache_key].append(each)
+                continue
+
+            image_path = self.get_cached_picture(cache_key)
+            if image_path:
+                self._transformed_pictures[id(each)] = image_path
+            else:
+                pending_pictures[cache_key] = [each]
+
+        # ? Identical pictures are transformed only once
+        pictures_to_transform = [each[0] for each in pending_pictures.values()]
+        transform = self.get_picture_transform()
+        if self._pictures_process_pool and len(pictures_to_transform) > 1:
+            image_paths = self._pictures_process_pool.map(
+                transform, pictures_to_transform
+            )
+        else:
+            image_paths = list(map(transform, pictures_to_transform))
+
+        for (cache_key, each_picture_models), image_path in zip(
+            pending_pictures.items(), image_paths
+        ):
+            for each in each_picture_models:
+                self._transformed_pictures[id(each)] = image_path
+            if image_path and self.get_picture_cache_key(each_picture_models[0]):
+                try:
+                    self._pictures_cache.put(cache_key, image_path)
+                except OSError as e:
+                    print(f"Could not cache picture: {e}")
+
+    def get_cached_picture(self, cache_key: str) -> Optional[str]:
+        cached_image_path = self._pictures_cache.get(cache_key)
+        if not cached_image_path:
+            return None
+
+        # ? Cached picture is linked into temp directory, so concurrent exports
+        # ? can't evict it before it is embedded
+        image_path = os.path.join(
+            self._temp_dir,
+            f"{uuid.uuid4()}{os.path.splitext(cached_image_path)[1]}",
+        )
+        try:
+            link_or_copy_file(cached_image_path, image_path)
+        except FileNotFoundError:
+            # ? Picture was evicted after it was found, so it is transformed again
+            return None
+        return image_path
+
+    def get_transformed_picture(
+        self, picture_model: PptxPictureBoxModel
+    ) -> Optional[str]:
+        if id(picture_model) in self._transformed_pictures:
+            return self._transformed_pictures[id(picture_model)]
+
+        return self.get_picture_transform()(picture_model)
+
+    def get_picture_transform(self):
+        return partial(
+            transform_picture,
+            output_directory=self._temp_dir,
+            target_dpi=self._target_dpi,
+            jpeg_quality=self._jpeg_quality,
+        )
+
     def add_autoshape(self, slide: Slide, autoshape_box_model: PptxAutoShapeBoxModel):
         position = autoshape_box_model.position
         if autoshape_box_model.margin:
@@ -370,73 +626,37 @@ class PptxPresentationCreator:
             text_run = paragraph.add_run()
             self.populate_text_run(text_run, text_run_model)
 
+    def get_font_variant(
+        self, font: PptxFontModel, bold: bool, italic: bool
+    ) -> PptxFontModel:
+        if not (bold or italic):
+            return font
+
+        # ? Bold and italic variants are created once per font
+        key = (id(font), bold, italic)
+        if key not in self._font_variants:
+            update = {}
+            if bold:
+                update["bold"] = True
+            if italic:
+                update["italic"] = True
+            self._font_variants[key] = (font, font.model_copy(update=update))
+        return self._font_variants[key][1]
+
     def parse_markdown_text_to_text_runs(self, font: PptxFontModel, text: str):
         text_runs = []
-        for line in text.split("\n"):
-            current_pos = 0
-            while current_pos < len(line):
-                # Check for bold and italic (***text***)
-                if (
-                    line[current_pos:].startswith("***")
-                    and "***" in line[current_pos + 3 :]
-                ):
-                    end_pos = line.find("***", current_pos + 3)
-                    text_content = line[current_pos + 3 : end_pos]
-                    font_json = font.model_dump()
-                    font_json["bold"] = True
-                    font_json["italic"] = True
-                    text_runs.append(
-                        PptxTextRunModel(
-                            text=text_content, font=PptxFontModel(**font_json)
-                        )
+        lines = text.split("\n")
+        for line in lines:
+            for text_content, bold, italic in tokenize_markdown_line(line):
+                text_runs.append(
+                    PptxTextRunModel(
+                        text=text_content,
+                        font=self.get_font_variant(font, bold, italic),
                     )
-                    current_pos = end_pos + 3
-                # Check for bold (**text**)
-                elif (
-                    line[current_pos:].startswith("**")
-                    and "**" in line[current_pos + 2 :]
-                ):
-                    end_pos = line.find("**", current_pos + 2)
-                    text_content = line[current_pos + 2 : end_pos]
-                    font_json = font.model_dump()
-                    font_json["bold"] = True
-                    text_runs.append(
-                        PptxTextRunModel(
-                            text=text_content, font=PptxFontModel(**font_json)
-                        )
-                    )
-                    current_pos = end_pos + 2
-                # Check for italic (*text*)
-                elif (
-                    line[current_pos:].startswith("__")
-                    and "__" in line[current_pos + 2 :]
-                ):
-                    end_pos = line.find("__", current_pos + 2)
-                    text_content = line[current_pos + 2 : end_pos]
-                    font_json = font.model_dump()
-                    font_json["italic"] = True
-                    text_runs.append(
-                        PptxTextRunModel(
-                            text=text_content, font=PptxFontModel(**font_json)
-                        )
-                    )
-                    current_pos = end_pos + 2
-                else:
-                    # Find the next formatting marker or end of line
-                    next_marker = float("inf")
-                    for marker in ["***", "**", "__"]:
-                        pos = line.find(marker, current_pos)
-                        if pos != -1:
-                            next_marker = min(next_marker, pos)
-
-                    end_pos = next_marker if next_marker != float("inf") else len(line)
-                    text_content = line[current_pos:end_pos]
-                    if text_content:  # Only add non-empty text
-                        text_runs.append(PptxTextRunModel(text=text_content, font=font))
-                    current_pos = end_pos
+                )
 
             # Add newline if not the last line
-            if line != text.split("\n")[-1]:
+            if line != lines[-1]:
                 text_runs.append(PptxTextRunModel(text="\n"))
 
         return text_runs
@@ -574,5 +794,16 @@ class PptxPresentationCreator:
     #         ),
     #     )
 
-    def save(self, path: str):
-        self._ppt.save(path)
+    def save(
+        self, file: Union[str, IO[bytes]], compression_level: Optional[int] = None
+    ):
+        if compression_level is None:
+            self._ppt.save(file)
+            return
+
+        # ? Package is written once straight into file with chosen compression,
+        # ? higher levels only cost more CPU for xml parts as media is stored
+        package = self._ppt.part.package
+        CompressedPackageWriter(
+            file, package._rels, tuple(package.iter_parts()), compression_level
+        )._write()
@@ -1,12 +1,13 @@
-from typing import Optional
+from typing import List, Optional
 import os
-from langchain_google_genai import ChatGoogleGenerativeAI
+from api.services.instances import llm_client_registry, llm_response_cache
+from api.services.llm_coalescer import get_llm_request_key
+from api.services.llm_scheduler import LLMPriority
 from ppt_generator.fix_validation_errors import get_validated_response
 from ppt_generator.models.content_type_models import (
     CONTENT_TYPE_MAPPING,
 )
 
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 
 from ppt_generator.models.other_models import SlideType, SlideTypeModel
@@ -27,6 +28,7 @@ prompt_template_from_slide = ChatPromptTemplate.from_messages(
                 - Generate **Image prompts** and **Icon queries** if asked to generate or change image or icons in prompt.
                 - Ensure there are no line breaks in the JSON.
                 - Do not use special characters for highlighting.
+                - Use **Document Excerpts** to ground the content if they are provided.
                 {notes}
 
                 **Go through all notes and steps and make sure they are followed, including mentioned constraints**
@@ -40,6 +42,7 @@ prompt_template_from_slide = ChatPromptTemplate.from_messages(
             - Image Prompts and Icon Queries Language: English
             - Theme: {theme}
             - Slide data: {slide_data}
+            {document_excerpts}
         """,
         ),
     ]
@@ -84,17 +87,25 @@ prompt_template_from_slide_type = ChatPromptTemplate.from_messages(
 )
 
 
+def get_document_excerpts_message(document_excerpts: Optional[List[str]]) -> str:
+    # ? Excerpts are left out of prompt when presentation has no documents
+    if not document_excerpts:
+        return ""
+    return "- Document Excerpts: " + "\n".join(document_excerpts)
+
+
 async def get_edited_slide_content_model(
     prompt: str,
     slide_type: SlideType,
     slide: SlideModel,
     theme: Optional[dict] = None,
     language: Optional[str] = None,
+    document_excerpts: Optional[List[str]] = None,
 ):
     model = (
-        ChatOpenAI(model="gpt-4.1-mini")
+        llm_client_registry.get_chat_model("openai", "gpt-4.1-mini")
         if os.getenv("LLM") == "openai"
-        else ChatGoogleGenerativeAI(model="gemini-2.0-flash")
+        else llm_client_registry.get_chat_model("google", "gemini-2.0-flash")
     )
 
     content_type_model_type = CONTENT_TYPE_MAPPING[slide_type]
@@ -110,8 +121,11 @@ async def get_edited_slide_content_model(
             "theme": theme,
             "slide_data": slide_data,
             "notes": "",
+            "document_excerpts": get_document_excerpts_message(document_excerpts),
         },
         content_type_model_type,
+        model,
+        priority=LLMPriority.INTERACTIVE,
     )
 
 
@@ -121,21 +135,28 @@ async def get_slide_type_from_prompt(
 ) -> SlideTypeModel:
 
     model = (
-        ChatOpenAI(model="gpt-4.1-mini")
+        llm_client_registry.get_chat_model("openai", "gpt-4.1-mini")
         if os.getenv("LLM") == "openai"
-        else ChatGoogleGenerativeAI(model="gemini-2.0-flash")
+        else llm_client_registry.get_chat_model("google", "gemini-2.0-flash")
     )
 
-    chain = prompt_template_from_slide_type | model.with_structured_output(
-        SlideTypeModel.model_json_schema()
-    )
-    slide_data = slide.content.model_dump_json()
-    return await get_validated_response(
-        chain,
-        {
-            "prompt": prompt,
-            "slide_data": slide_data,
-            "slide_type": slide.type,
-        },
+    schema = SlideTypeModel.model_json_schema()
+    chain = prompt_template_from_slide_type | model.with_structured_output(schema)
+    input_dict = {
+        "prompt": prompt,
+        "slide_data": slide.content.model_dump_json(),
+        "slide_type": slide.type,
+    }
+    return await llm_response_cache.run(
+        get_llm_request_key(
+            model, prompt_template_from_slide_type.format_messages(**input_dict), schema
+        ),
         SlideTypeModel,
+        lambda: get_validated_response(
+            chain,
+            input_dict,
+            SlideTypeModel,
+            model,
+            priority=LLMPriority.INTERACTIVE,
+        ),
     )
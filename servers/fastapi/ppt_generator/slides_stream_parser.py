@@ -0,0 +1,102 @@
+import json
+from typing import List, Tuple
+
+
+# ? Scans streamed JSON character by character and returns every element of the
+# ? top-level array (slides) along with its index as soon as it is closed
+class SlidesStreamParser:
+
+    def __init__(self, array_key: str = "slides"):
+        self._array_key = array_key
+
+        self._text = ""
+        self._position = 0
+
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._string_start = None
+        self._last_key = None
+
+        self._array_depth = None
+        self._element_start = None
+
+        self._parsed_count = 0
+
+    @property
+    def text(self) -> str:
+        return self._text
+
+    @property
+    def parsed_count(self) -> int:
+        return self._parsed_count
+
+    def feed(self, chunk: str) -> List[Tuple[int, dict]]:
+        self._text += chunk
+        completed_elements = []
+
+        text = self._text
+        for position in range(self._position, len(text)):
+            character = text[position]
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif character == "\\":
+                    self._escaped = True
+                elif character == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._array_depth is None:
+                        self._last_key = text[self._string_start + 1 : position]
+                continue
+
+            if character == '"':
+                self._in_string = True
+                self._string_start = position
+
+            elif character in "{[":
+                self._depth += 1
+                if (
+                    character == "["
+                    and self._array_depth is None
+                    and self._depth == 2
+                    and self._last_key == self._array_key
+                ):
+                    self._array_depth = self._depth
+                elif (
+                    character == "{"
+                    and self._array_depth is not None
+                    and self._depth == self._array_depth + 1
+                ):
+                    self._element_start = position
+
+            elif character in "}]":
+                if (
+                    character == "}"
+                    and self._element_start is not None
+                    and self._depth == self._array_depth + 1
+                ):
+                    element = self._load_element(
+                        text[self._element_start : position + 1]
+                    )
+                    if element is not None:
+                        completed_elements.append((self._parsed_count, element))
+                    self._element_start = None
+                    self._parsed_count += 1
+
+                elif character == "]" and self._depth == self._array_depth:
+                    self._array_depth = None
+
+                self._depth -= 1
+
+            elif character == "," and self._depth == 1:
+                self._last_key = None
+
+        self._position = len(text)
+        return completed_elements
+
+    def _load_element(self, element_text: str):
+        try:
+            return json.loads(element_text)
+        except json.JSONDecodeError:
+            return None
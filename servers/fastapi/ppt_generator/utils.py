@@ -1,9 +1,25 @@
-from typing import List, Optional
+import bisect
+import functools
+import hashlib
+import json
+import os
+import uuid
+from typing import List, Optional, Tuple
 from pptx.util import Pt
 
-from PIL import Image, ImageDraw
+from PIL import Image, ImageChops, ImageDraw
 
-from ppt_generator.models.pptx_models import PptxObjectFitEnum, PptxObjectFitModel
+from api.services.file_cache import get_file_hash
+from ppt_generator.models.pptx_models import (
+    PptxBoxShapeEnum,
+    PptxObjectFitEnum,
+    PptxObjectFitModel,
+    PptxPictureBoxModel,
+)
+
+# ? Change this whenever transform_picture output changes to invalidate cached pictures
+PICTURE_TRANSFORM_VERSION = 1
+MASKS_CACHE_SIZE = 32
 
 
 def pt_from_optional_int(num: Optional[int]):
@@ -12,6 +28,58 @@ def pt_from_optional_int(num: Optional[int]):
     return Pt(num)
 
 
+# ? Markdown markers by priority with their (bold, italic) style
+MARKDOWN_MARKERS = [("***", True, True), ("**", True, False), ("__", False, True)]
+
+
+def find_all(text: str, substring: str) -> List[int]:
+    # ? Overlapping occurrences are included, same as str.find from every position
+    positions = []
+    position = text.find(substring)
+    while position != -1:
+        positions.append(position)
+        position = text.find(substring, position + 1)
+    return positions
+
+
+def tokenize_markdown_line(line: str) -> List[Tuple[str, bool, bool]]:
+    markers = [
+        (marker, bold, italic, find_all(line, marker))
+        for marker, bold, italic in MARKDOWN_MARKERS
+    ]
+
+    # ? A marker at a position is closed only if the same marker appears after it
+    def get_closing_position(marker: str, positions: List[int], position: int):
+        index = bisect.bisect_left(positions, position + len(marker))
+        return positions[index] if index < len(positions) else None
+
+    tokens = []
+    current_pos = 0
+    while current_pos < len(line):
+        next_marker_pos = len(line)
+        for marker, bold, italic, positions in markers:
+            index = bisect.bisect_left(positions, current_pos)
+            if index == len(positions):
+                continue
+            position = positions[index]
+            if position == current_pos:
+                end_pos = get_closing_position(marker, positions, position)
+                if end_pos is not None:
+                    tokens.append(
+                        (line[position + len(marker) : end_pos], bold, italic)
+                    )
+                    current_pos = end_pos + len(marker)
+                    break
+            elif get_closing_position(marker, positions, position) is not None:
+                next_marker_pos = min(next_marker_pos, position)
+        else:
+            # ? Unclosed markers are kept as plain text
+            tokens.append((line[current_pos:next_marker_pos], False, False))
+            current_pos = next_marker_pos
+
+    return tokens
+
+
 def clip_image(
     image: Image.Image,
     width: int,
@@ -53,22 +121,17 @@ def clip_image(
     return clipped_image
 
 
-def round_image_corners(image: Image.Image, radii: List[int]) -> Image.Image:
-    if len(radii) != 4:
-        raise ValueError(
-            "Image Border Radius - radii must contain exactly 4 values for each corner"
-        )
-
-    w, h = image.size
-    # Ensure the image has an alpha channel (RGBA)
-    if image.mode != "RGBA":
-        image = image.convert("RGBA")
+@functools.lru_cache(maxsize=MASKS_CACHE_SIZE)
+def get_rounded_corners_mask(
+    size: Tuple[int, int], radii: Tuple[int, int, int, int]
+) -> Image.Image:
+    w, h = size
 
     # Create a mask for the rounded corners (start with fully transparent)
-    rounded_mask = Image.new("L", image.size, 0)
+    rounded_mask = Image.new("L", size, 0)
 
     # Create a rectangular mask (fully opaque)
-    rectangular_mask = Image.new("L", image.size, 255)
+    rectangular_mask = Image.new("L", size, 255)
 
     # Process each corner
     for i, radius in enumerate(radii):
@@ -99,64 +162,53 @@ def round_image_corners(image: Image.Image, radii: List[int]) -> Image.Image:
                 )
                 rectangular_mask.paste(0, (0, h - radius, radius, h))
 
-    # Get the original alpha channel
-    original_alpha = image.getchannel("A")
-
     # Combine the rectangular mask with the rounded corners
-    corner_mask = Image.composite(rounded_mask, rectangular_mask, rounded_mask)
+    return Image.composite(rounded_mask, rectangular_mask, rounded_mask)
 
-    # Combine the corner mask with the original alpha channel
-    final_alpha = Image.composite(
-        original_alpha, Image.new("L", image.size, 0), corner_mask
-    )
 
-    # Create a new image with the modified alpha channel
-    result = Image.new("RGBA", image.size)
-    result.paste(image.convert("RGB"), (0, 0))
-    result.putalpha(final_alpha)
+def round_image_corners(image: Image.Image, radii: List[int]) -> Image.Image:
+    if len(radii) != 4:
+        raise ValueError(
+            "Image Border Radius - radii must contain exactly 4 values for each corner"
+        )
+
+    # Ensure the image has an alpha channel (RGBA)
+    if image.mode != "RGBA":
+        image = image.convert("RGBA")
+
+    # ? Masks are shared between pictures of same size and radii
+    corner_mask = get_rounded_corners_mask(image.size, tuple(radii))
 
+    result = image.copy()
+    result.putalpha(ImageChops.multiply(image.getchannel("A"), corner_mask))
     return result
 
 
 def change_image_color(img: Image.Image, color: str) -> Image.Image:
-    # r, g, b, alpha = img.split()
-
-    # color_overlay = Image.new("RGBA", img.size, color=f"#{color}")
-    # return Image.composite(color_overlay, img, alpha)
     if color.startswith("#"):
         color = color[1:]
     r_new = int(color[:2], 16)
     g_new = int(color[2:4], 16)
     b_new = int(color[4:], 16)
 
-    # Get image data
-    data = img.getdata()
-
-    # Process each pixel
-    new_data = []
-    for item in data:
-        # Get current pixel values
-        r, g, b, a = item
-
-        # Apply new color while preserving transparency
-        if a != 0:  # Skip fully transparent pixels
-            new_data.append((r_new, g_new, b_new, a))
-        else:
-            new_data.append((0, 0, 0, 0))
-
-    # Create new image with modified data
-    new_img = Image.new("RGBA", img.size)
-    new_img.putdata(new_data)
-    return new_img
+    if img.mode != "RGBA":
+        img = img.convert("RGBA")
+    alpha = img.getchannel("A")
+
+    # ? Each channel is mapped from alpha through a lookup table instead of per pixel
+    # ? Visible pixels get the new color, fully transparent pixels become (0, 0, 0, 0)
+    return Image.merge(
+        "RGBA",
+        [
+            alpha.point([0] + [channel] * 255)
+            for channel in (r_new, g_new, b_new)
+        ]
+        + [alpha],
+    )
 
 
-def create_circle_image(
-    image: Image.Image,
-) -> Image.Image:
-    # Convert to RGBA if not already
-    img = image.convert("RGBA")
-    # Get the original image size
-    size = img.size
+@functools.lru_cache(maxsize=MASKS_CACHE_SIZE)
+def get_circle_mask(size: Tuple[int, int]) -> Image.Image:
     # Use the smaller dimension for the circle
     circle_size = min(size)
     # Create a transparent image of the same size as original
@@ -178,10 +230,18 @@ def create_circle_image(
         ),
         fill=(255, 255, 255, 255),
     )
+    return mask
+
+
+def create_circle_image(
+    image: Image.Image,
+) -> Image.Image:
+    # Convert to RGBA if not already
+    img = image if image.mode == "RGBA" else image.convert("RGBA")
 
     # Apply the circular mask
-    result = Image.composite(img, mask, mask)
-    return result
+    mask = get_circle_mask(img.size)
+    return Image.composite(img, mask, mask)
 
 
 def fit_image(
@@ -246,3 +306,103 @@ def fit_image(
         return image.resize((width, height), Image.LANCZOS)
 
     return image
+
+
+def picture_needs_transform(
+    picture_model: PptxPictureBoxModel,
+    target_dpi: Optional[int] = None,
+    jpeg_quality: Optional[int] = None,
+) -> bool:
+    return bool(
+        target_dpi
+        or jpeg_quality
+        or picture_model.clip
+        or picture_model.border_radius
+        or picture_model.overlay
+        or picture_model.object_fit
+        or picture_model.shape
+    )
+
+
+def get_picture_cache_key(
+    picture_model: PptxPictureBoxModel,
+    target_dpi: Optional[int] = None,
+    jpeg_quality: Optional[int] = None,
+) -> str:
+    key = json.dumps(
+        [
+            PICTURE_TRANSFORM_VERSION,
+            get_file_hash(picture_model.picture.path),
+            picture_model.position.width,
+            picture_model.position.height,
+            picture_model.clip,
+            picture_model.overlay,
+            picture_model.border_radius,
+            picture_model.shape.value if picture_model.shape else None,
+            (
+                picture_model.object_fit.model_dump(mode="json")
+                if picture_model.object_fit
+                else None
+            ),
+            target_dpi,
+            jpeg_quality,
+        ]
+    )
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def has_transparency(image: Image.Image) -> bool:
+    if image.mode in ("RGBA", "LA", "PA"):
+        return image.getchannel("A").getextrema()[0] < 255
+    return image.mode == "P" and "transparency" in image.info
+
+
+def transform_picture(
+    picture_model: PptxPictureBoxModel,
+    output_directory: str,
+    target_dpi: Optional[int] = None,
+    jpeg_quality: Optional[int] = None,
+) -> Optional[str]:
+    image_path = picture_model.picture.path
+    try:
+        image = Image.open(image_path)
+    except:
+        print(f"Could not open image: {image_path}")
+        return None
+
+    # ? Positions are in points, so without target dpi pictures are rendered at 72 dpi
+    scale = target_dpi / 72 if target_dpi else 1
+    width = max(1, round(picture_model.position.width * scale))
+    height = max(1, round(picture_model.position.height * scale))
+    border_radius = picture_model.border_radius and [
+        round(each * scale) for each in picture_model.border_radius
+    ]
+
+    image = image.convert("RGBA")
+    # ? Applying border radius twice to support both clip and object fit
+    if border_radius:
+        image = round_image_corners(image, border_radius)
+    if picture_model.object_fit:
+        image = fit_image(image, width, height, picture_model.object_fit)
+    elif picture_model.clip:
+        image = clip_image(image, width, height)
+    if border_radius:
+        image = round_image_corners(image, border_radius)
+    if picture_model.shape == PptxBoxShapeEnum.CIRCLE:
+        image = create_circle_image(image)
+    if picture_model.overlay:
+        image = change_image_color(image, picture_model.overlay)
+
+    # ? Pictures are stretched to their box, so pixels beyond target dpi are never seen
+    if target_dpi and (image.width > width or image.height > height):
+        image = image.resize(
+            (min(image.width, width), min(image.height, height)), Image.LANCZOS
+        )
+
+    if jpeg_quality and not has_transparency(image):
+        output_path = os.path.join(output_directory, f"{str(uuid.uuid4())}.jpg")
+        image.convert("RGB").save(output_path, quality=jpeg_quality, optimize=True)
+    else:
+        output_path = os.path.join(output_directory, f"{str(uuid.uuid4())}.png")
+        image.save(output_path)
+    return output_path
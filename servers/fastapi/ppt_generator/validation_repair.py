@@ -0,0 +1,166 @@
+import copy
+import difflib
+import json
+import re
+import types
+from typing import Any, Optional, Type, Union, get_args, get_origin
+
+from pydantic import BaseModel, ValidationError
+
+NUMBER_PATTERN = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+def truncate_at_word_boundary(text: str, max_length: int) -> str:
+    if len(text) <= max_length:
+        return text
+    truncated = text[:max_length]
+    # ? Words are not cut unless the text would lose more than half of its length
+    space = truncated.rfind(" ")
+    if space > max_length // 2:
+        truncated = truncated[:space]
+    return truncated.rstrip(" ,;:-")
+
+
+def normalize_field_name(name: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+
+def unwrap_annotation(annotation):
+    # ? Unwraps Optional and List annotations, unions of multiple types can't be unwrapped
+    while get_origin(annotation) in (list, Union, types.UnionType):
+        arguments = [
+            argument for argument in get_args(annotation) if argument is not type(None)
+        ]
+        if len(arguments) != 1:
+            return None
+        annotation = arguments[0]
+    return annotation
+
+
+def get_model_at(model: Type[BaseModel], loc: tuple) -> Optional[Type[BaseModel]]:
+    annotation = model
+    for each in loc:
+        annotation = unwrap_annotation(annotation)
+        if isinstance(each, int):
+            continue
+        if not (isinstance(annotation, type) and issubclass(annotation, BaseModel)):
+            return None
+        field = annotation.model_fields.get(each)
+        if not field:
+            return None
+        annotation = field.annotation
+
+    annotation = unwrap_annotation(annotation)
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    return None
+
+
+def get_container(response: Any, loc: tuple):
+    container = response
+    for each in loc:
+        if isinstance(each, int) and isinstance(container, list):
+            if each >= len(container):
+                return None
+        elif not (isinstance(container, dict) and each in container):
+            return None
+        container = container[each]
+    return container
+
+
+def parse_number(value: Any, number_type: type):
+    if isinstance(value, list) and len(value) == 1:
+        value = value[0]
+    if isinstance(value, float) and number_type is int:
+        return round(value)
+    if isinstance(value, str):
+        match = NUMBER_PATTERN.search(value.replace(",", ""))
+        if match:
+            return number_type(float(match.group()))
+    return None
+
+
+def repair_value(error_type: str, value: Any, ctx: dict):
+    if error_type == "string_too_long":
+        return truncate_at_word_boundary(value, ctx["max_length"])
+
+    elif error_type == "too_long" and isinstance(value, list):
+        return value[: ctx["max_length"]]
+
+    elif error_type == "list_type":
+        if isinstance(value, str) and value.strip().startswith("["):
+            try:
+                parsed = json.loads(value)
+                if isinstance(parsed, list):
+                    return parsed
+            except json.JSONDecodeError:
+                pass
+        if isinstance(value, (str, dict)):
+            return [value]
+
+    elif error_type == "string_type":
+        if isinstance(value, list) and len(value) == 1 and isinstance(value[0], str):
+            return value[0]
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return str(value)
+
+    elif error_type in ("int_parsing", "int_type", "int_from_float"):
+        return parse_number(value, int)
+
+    elif error_type in ("float_parsing", "float_type"):
+        return parse_number(value, float)
+
+    return None
+
+
+def repair_error(response_model: Type[BaseModel], response: dict, error: dict) -> bool:
+    loc = error["loc"]
+    container = get_container(response, loc[:-1])
+    # ? Value might have already been removed by another repair
+    if container is None:
+        return False
+
+    if error["type"] == "missing":
+        model = get_model_at(response_model, loc[:-1])
+        if not model or not isinstance(container, dict):
+            return False
+        # ? Misnamed key is renamed to the most similar one not in the model
+        extra_keys = {
+            normalize_field_name(key): key
+            for key in container
+            if key not in model.model_fields
+        }
+        matches = difflib.get_close_matches(
+            normalize_field_name(loc[-1]), list(extra_keys), n=1, cutoff=0.6
+        )
+        if not matches:
+            return False
+        container[loc[-1]] = container.pop(extra_keys[matches[0]])
+        return True
+
+    if not isinstance(loc[-1], (str, int)) or get_container(response, loc) is None:
+        return False
+
+    repaired = repair_value(error["type"], container[loc[-1]], error.get("ctx", {}))
+    if repaired is None:
+        return False
+    container[loc[-1]] = repaired
+    return True
+
+
+def repair_response(
+    response_model: Type[BaseModel], response: Any, max_rounds: int = 3
+) -> Optional[BaseModel]:
+    if not isinstance(response, dict):
+        return None
+
+    response = copy.deepcopy(response)
+    for _ in range(max_rounds):
+        try:
+            return response_model(**response)
+        except ValidationError as e:
+            # ? Deeper errors are repaired first so clipping lists doesn't move them
+            errors = sorted(e.errors(), key=lambda error: -len(error["loc"]))
+            if not all(repair_error(response_model, response, each) for each in errors):
+                return None
+    return None
@@ -1,8 +1,8 @@
 import os
 from typing import Optional
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_openai import ChatOpenAI
+
+from api.services.instances import llm_client_registry
 
 # search_tool = DuckDuckGoSearchRun(
 #     api_wrapper=DuckDuckGoSearchAPIWrapper(max_results=50)
@@ -40,9 +40,9 @@ prompt_template = ChatPromptTemplate.from_messages(
 
 async def get_report(query: str, language: Optional[str]):
     model = (
-        ChatOpenAI(model="gpt-4.1-nano")
+        llm_client_registry.get_chat_model("openai", "gpt-4.1-nano")
         if os.getenv("LLM") == "openai"
-        else ChatGoogleGenerativeAI(model="gemini-2.0-flash")
+        else llm_client_registry.get_chat_model("google", "gemini-2.0-flash")
     )
     chain = prompt_template | model
 
@@ -0,0 +1,48 @@
+import random
+
+from PIL import Image
+
+from ppt_generator.utils import change_image_color
+
+
+def change_image_color_per_pixel(img: Image.Image, color: str) -> Image.Image:
+    if color.startswith("#"):
+        color = color[1:]
+    r_new = int(color[:2], 16)
+    g_new = int(color[2:4], 16)
+    b_new = int(color[4:], 16)
+
+    new_data = []
+    for r, g, b, a in img.getdata():
+        if a != 0:
+            new_data.append((r_new, g_new, b_new, a))
+        else:
+            new_data.append((0, 0, 0, 0))
+
+    new_img = Image.new("RGBA", img.size)
+    new_img.putdata(new_data)
+    return new_img
+
+
+def test_change_image_color_matches_per_pixel_implementation():
+    random.seed(0)
+    image = Image.new("RGBA", (67, 41))
+    image.putdata(
+        [
+            (
+                random.randint(0, 255),
+                random.randint(0, 255),
+                random.randint(0, 255),
+                random.choice([0, 0, 1, 128, 255, random.randint(0, 255)]),
+            )
+            for _ in range(67 * 41)
+        ]
+    )
+
+    for color in ["#1a2b3c", "ff0000", "000000"]:
+        expected = change_image_color_per_pixel(image, color)
+        result = change_image_color(image, color)
+
+        assert result.mode == expected.mode
+        assert result.size == expected.size
+        assert result.tobytes() == expected.tobytes()
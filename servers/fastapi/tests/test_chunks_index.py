@@ -0,0 +1,71 @@
+import numpy as np
+from langchain_core.documents import Document
+
+from document_processor import chunks_index
+from document_processor.chunks_index import (
+    build_chunks_index,
+    load_chunks_index,
+    search_document_chunks,
+)
+
+WORDS = ["apple", "banana", "cherry", "grape"]
+
+
+class StubEmbeddingModel:
+
+    # ? Every text is embedded by the words it contains
+    def embed(self, texts):
+        for text in texts:
+            yield np.array([float(word in text) for word in WORDS])
+
+    def query_embed(self, queries):
+        return self.embed(queries)
+
+
+def get_documents():
+    return [
+        Document(page_content="apple and banana"),
+        Document(page_content="  "),
+        Document(page_content="cherry"),
+        Document(page_content="apple"),
+        Document(page_content="grape and cherry"),
+    ]
+
+
+def test_builds_and_loads_index(tmp_path, monkeypatch):
+    monkeypatch.setenv("APP_DATA_DIRECTORY", str(tmp_path))
+    monkeypatch.setattr(chunks_index, "get_embedding_model", StubEmbeddingModel)
+
+    built_index = build_chunks_index("presentation", get_documents())
+    assert built_index.chunks == [
+        "apple and banana",
+        "cherry",
+        "apple",
+        "grape and cherry",
+    ]
+
+    loaded_index = load_chunks_index("presentation")
+    assert loaded_index.chunks == built_index.chunks
+    assert loaded_index.search(["cherry"], 1) == built_index.search(["cherry"], 1)
+
+
+def test_returns_top_k_chunks_in_document_order(tmp_path, monkeypatch):
+    monkeypatch.setenv("APP_DATA_DIRECTORY", str(tmp_path))
+    monkeypatch.setattr(chunks_index, "get_embedding_model", StubEmbeddingModel)
+    monkeypatch.setenv("DOCUMENT_CHUNKS_TOP_K", "2")
+    build_chunks_index("presentation", get_documents())
+
+    assert search_document_chunks("presentation", ["apple", "cherry"]) == [
+        ["apple and banana", "apple"],
+        ["cherry", "grape and cherry"],
+    ]
+    assert search_document_chunks("presentation", []) == []
+
+
+def test_presentation_without_documents_has_no_index(tmp_path, monkeypatch):
+    monkeypatch.setenv("APP_DATA_DIRECTORY", str(tmp_path))
+    monkeypatch.setattr(chunks_index, "get_embedding_model", StubEmbeddingModel)
+
+    assert build_chunks_index("presentation", [Document(page_content=" ")]) is None
+    assert load_chunks_index("presentation") is None
+    assert search_document_chunks("presentation", ["apple"]) is None
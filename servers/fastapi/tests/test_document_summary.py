@@ -0,0 +1,79 @@
+import asyncio
+
+from langchain_core.documents import Document
+
+from api.services.instances import llm_client_registry
+from ppt_config_generator import document_summary_generator
+from ppt_config_generator.document_summary_generator import (
+    chunk_summary_prompt_template,
+    combine_summaries_prompt_template,
+    generate_document_summary,
+    group_summaries,
+    prompt_template,
+)
+
+
+def test_groups_summaries_by_size():
+    assert group_summaries(["a" * 40] * 4, 100) == [["a" * 40] * 2] * 2
+    assert group_summaries(["a" * 10] * 4, 100) == [["a" * 10] * 4]
+
+
+def test_groups_have_at_least_two_summaries():
+    assert group_summaries(["a" * 200, "b" * 200, "c" * 200, "d" * 200], 100) == [
+        ["a" * 200, "b" * 200],
+        ["c" * 200, "d" * 200],
+    ]
+
+
+def test_single_trailing_summary_joins_previous_group():
+    assert group_summaries(["a" * 40] * 5, 100) == [
+        ["a" * 40] * 2,
+        ["a" * 40] * 3,
+    ]
+    assert group_summaries(["a" * 40], 100) == [["a" * 40]]
+
+
+def summarize(documents, monkeypatch):
+    monkeypatch.setenv("DOCUMENT_SUMMARY_CHUNK_SIZE", "100")
+    monkeypatch.setattr(
+        llm_client_registry, "get_chat_model", lambda *args, **kwargs: None
+    )
+    templates = []
+
+    async def get_summary(model, template, text):
+        templates.append(template)
+        return "summary" if template is prompt_template else "s" * 40
+
+    monkeypatch.setattr(document_summary_generator, "get_summary", get_summary)
+    progress = []
+    summary = asyncio.run(
+        generate_document_summary(
+            documents, lambda completed, total: progress.append((completed, total))
+        )
+    )
+    return summary, templates, progress
+
+
+def test_reduces_summaries_level_by_level(monkeypatch):
+    # ? Every line is a chunk of its own
+    text = "\n".join(f"{i:02d}" + "x" * 58 for i in range(10))
+    summary, templates, progress = summarize([Document(page_content=text)], monkeypatch)
+
+    assert summary == "summary"
+    # ? 10 chunk summaries are reduced to 5 and then to 2 summaries
+    assert templates.count(chunk_summary_prompt_template) == 10
+    assert templates.count(combine_summaries_prompt_template) == 7
+    assert templates[-1] is prompt_template
+    assert progress[-1] == (18, 18)
+    assert all(completed <= total for completed, total in progress)
+
+
+def test_single_chunk_is_summarized_once(monkeypatch):
+    summary, templates, progress = summarize(
+        [Document(page_content="short"), Document(page_content="")], monkeypatch
+    )
+
+    assert summary == "summary\n\n\n\nsummary"
+    assert templates == [prompt_template, prompt_template]
+    assert len(progress) == 2
+    assert progress[-1] == (2, 2)
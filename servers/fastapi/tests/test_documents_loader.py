@@ -0,0 +1,53 @@
+import asyncio
+import shutil
+
+from api.services.process_pool import ProcessPoolService
+from document_processor.loader import DocumentsLoader
+
+PDF_PATH = "tests/assets/impact_of_llms.pdf"
+
+
+def get_document_paths(tmp_path):
+    text_path = str(tmp_path / "notes.txt")
+    with open(text_path, "w") as f:
+        f.write("Notes about large language models")
+    pdf_path = str(tmp_path / "impact.pdf")
+    shutil.copyfile(PDF_PATH, pdf_path)
+    # ? Same path is loaded twice to check that every load is kept
+    return [pdf_path, text_path, pdf_path]
+
+
+def load_documents(document_paths, process_pool=None) -> DocumentsLoader:
+    documents_loader = DocumentsLoader(document_paths, process_pool)
+    asyncio.run(documents_loader.load_documents("", split_documents=True))
+    return documents_loader
+
+
+def check_loaded_documents(documents_loader: DocumentsLoader, document_paths):
+    documents = documents_loader.documents
+    assert len(documents) == 3
+    assert documents[0].page_content.startswith("The Impact of Large Language")
+    assert documents[1].page_content == "Notes about large language models"
+    assert documents[2].page_content == documents[0].page_content
+    assert documents_loader.splitted_documents
+
+    assert [each[0] for each in documents_loader.load_times] == document_paths
+    assert all(each[1] > 0 for each in documents_loader.load_times)
+
+
+def test_loads_documents_in_order_with_process_pool(tmp_path):
+    document_paths = get_document_paths(tmp_path)
+    process_pool = ProcessPoolService(2)
+    process_pool.start()
+    try:
+        documents_loader = load_documents(document_paths, process_pool)
+    finally:
+        process_pool.shutdown()
+
+    check_loaded_documents(documents_loader, document_paths)
+    assert process_pool.stats["crashes"] == 0
+
+
+def test_loads_documents_in_threads_without_process_pool(tmp_path):
+    document_paths = get_document_paths(tmp_path)
+    check_loaded_documents(load_documents(document_paths), document_paths)
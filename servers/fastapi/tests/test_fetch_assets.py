@@ -0,0 +1,51 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from api.routers.presentation.mixins.fetch_assets_on_generation import (
+    FetchAssetsOnPresentationGenerationMixin,
+)
+
+
+class AssetsFetcher(FetchAssetsOnPresentationGenerationMixin):
+
+    def __init__(self, icons_error: bool = False):
+        self.icons_error = icons_error
+        self.images_generations = []
+
+    def start_slide_images_generation(self, slide_model):
+        task = asyncio.create_task(asyncio.sleep(60))
+        self.images_generations.append(task)
+        return [task]
+
+    async def fetch_slide_icons(self, slide_models):
+        if self.icons_error:
+            raise ValueError("Icons failed")
+        await asyncio.sleep(60)
+        return []
+
+
+def test_fetches_are_cancelled_when_client_disconnects():
+    async def disconnect():
+        fetcher = AssetsFetcher()
+        stream = fetcher.fetch_slide_assets([SimpleNamespace(index=0)])
+        await stream.__anext__()
+        await stream.aclose()
+        await asyncio.sleep(0)
+        # ? Checked before event loop closes, as it cancels every remaining task
+        return [each.cancelled() for each in fetcher.images_generations]
+
+    assert asyncio.run(disconnect()) == [True]
+
+
+def test_fetches_are_cancelled_when_one_fails():
+    async def fail():
+        fetcher = AssetsFetcher(icons_error=True)
+        with pytest.raises(ValueError):
+            async for _ in fetcher.fetch_slide_assets([SimpleNamespace(index=0)]):
+                pass
+        await asyncio.sleep(0)
+        return [each.cancelled() for each in fetcher.images_generations]
+
+    assert asyncio.run(fail()) == [True]
@@ -0,0 +1,43 @@
+import os
+import time
+
+from api.services.file_cache import FileCacheService
+
+
+def write_file(path, size: int) -> str:
+    with open(path, "wb") as f:
+        f.write(b"0" * size)
+    return str(path)
+
+
+def test_replaced_entries_are_not_counted_twice(tmp_path):
+    cache = FileCacheService(str(tmp_path / "cache"), 1)
+    source = write_file(tmp_path / "image.png", 100)
+
+    cache.put("aa11", source)
+    assert cache.stats["size"] == 100
+    for _ in range(3):
+        cache.put("aa11", source)
+    assert cache.stats["size"] == 100
+
+    assert cache.get("aa11")
+    assert cache.get("bb22") is None
+    assert cache.stats["hits"] == 1
+    assert cache.stats["misses"] == 1
+
+
+def test_entries_being_put_are_not_evicted(tmp_path):
+    cache = FileCacheService(str(tmp_path / "cache"), 150 / (1024 * 1024))
+    # ? Temp link of an entry being put has old mtime of its source
+    source = write_file(tmp_path / "image.png", 100)
+    os.utime(source, (time.time() - 3600, time.time() - 3600))
+    os.makedirs(cache.get_entry_dir("cc33"))
+    temp_path = os.path.join(cache.get_entry_dir("cc33"), ".pending")
+    os.link(source, temp_path)
+
+    cache.put("aa11", write_file(tmp_path / "other.png", 100))
+    cache.put("bb22", write_file(tmp_path / "another.png", 100))
+
+    assert os.path.exists(temp_path)
+    assert cache.get("aa11") is None
+    assert cache.get("bb22")
@@ -1,15 +1,14 @@
 import asyncio
 import os
 
-from image_processor.icons_finder import get_icon
-from image_processor.icons_vectorstore_utils import get_icons_vectorstore
+from api.utils import get_resource
+from image_processor.icons_finder import get_icon, get_icons
+from image_processor.icons_vectorstore_utils import get_icons_index
 from ppt_generator.models.content_type_models import IconQueryCollectionModel
 from ppt_generator.models.query_and_prompt_models import IconQueryCollectionWithData
 
 
 def test_get_icon():
-    vector_store = get_icons_vectorstore()
-
     for query in [
         "thermometer high",
         "rainstorm",
@@ -18,16 +17,26 @@ def test_get_icon():
         "efficient light bulb",
         "sustainable leaf",
     ]:
-        asyncio.run(
+        icon_path = asyncio.run(
             get_icon(
-                vector_store,
                 IconQueryCollectionWithData(
                     icon_query=IconQueryCollectionModel(queries=[query]),
                     index=0,
                 ),
-                os.path.join(
-                    os.getenv("APP_DATA_DIRECTORY"), f"generated_icons/{query}.png"
-                ),
             )
         )
-        break
+        # ? Placeholder is returned when icons index can't be used
+        assert icon_path != get_resource("assets/icons/placeholder.png")
+        assert os.path.exists(icon_path)
+
+
+def test_get_icons():
+    icon_paths = asyncio.run(get_icons("light bulb", 1, 5, None, ""))
+
+    assert len(icon_paths) == 5
+    assert all(os.path.exists(each) for each in icon_paths)
+    assert os.path.basename(icon_paths[0]).startswith("lightbulb")
+
+
+def test_icons_index_is_shared():
+    assert get_icons_index() is get_icons_index()
@@ -0,0 +1,130 @@
+import random
+from typing import List
+
+from PIL import Image, ImageDraw
+
+from ppt_generator.utils import (
+    create_circle_image,
+    get_circle_mask,
+    get_rounded_corners_mask,
+    round_image_corners,
+)
+
+
+# ? Copy of round_image_corners before masks were cached
+def previous_round_image_corners(image: Image.Image, radii: List[int]) -> Image.Image:
+    w, h = image.size
+    if image.mode != "RGBA":
+        image = image.convert("RGBA")
+
+    rounded_mask = Image.new("L", image.size, 0)
+    rectangular_mask = Image.new("L", image.size, 255)
+
+    for i, radius in enumerate(radii):
+        if radius > 0:
+            circle = Image.new("L", (radius * 2, radius * 2), 0)
+            draw = ImageDraw.Draw(circle)
+            draw.ellipse((0, 0, radius * 2 - 1, radius * 2 - 1), fill=255)
+
+            if i == 0:
+                rounded_mask.paste(circle.crop((0, 0, radius, radius)), (0, 0))
+                rectangular_mask.paste(0, (0, 0, radius, radius))
+            elif i == 1:
+                rounded_mask.paste(
+                    circle.crop((radius, 0, radius * 2, radius)), (w - radius, 0)
+                )
+                rectangular_mask.paste(0, (w - radius, 0, w, radius))
+            elif i == 2:
+                rounded_mask.paste(
+                    circle.crop((radius, radius, radius * 2, radius * 2)),
+                    (w - radius, h - radius),
+                )
+                rectangular_mask.paste(0, (w - radius, h - radius, w, h))
+            else:
+                rounded_mask.paste(
+                    circle.crop((0, radius, radius, radius * 2)), (0, h - radius)
+                )
+                rectangular_mask.paste(0, (0, h - radius, radius, h))
+
+    original_alpha = image.getchannel("A")
+    corner_mask = Image.composite(rounded_mask, rectangular_mask, rounded_mask)
+    final_alpha = Image.composite(
+        original_alpha, Image.new("L", image.size, 0), corner_mask
+    )
+
+    result = Image.new("RGBA", image.size)
+    result.paste(image.convert("RGB"), (0, 0))
+    result.putalpha(final_alpha)
+    return result
+
+
+# ? Copy of create_circle_image before masks were cached
+def previous_create_circle_image(image: Image.Image) -> Image.Image:
+    img = image.convert("RGBA")
+    size = img.size
+    circle_size = min(size)
+    mask = Image.new("RGBA", size, color=(0, 0, 0, 0))
+    draw = ImageDraw.Draw(mask)
+
+    center_x = size[0] // 2
+    center_y = size[1] // 2
+    radius = circle_size // 2
+    draw.ellipse(
+        (center_x - radius, center_y - radius, center_x + radius, center_y + radius),
+        fill=(255, 255, 255, 255),
+    )
+    return Image.composite(img, mask, mask)
+
+
+def get_random_image(size, mode: str, seed: int) -> Image.Image:
+    random.seed(seed)
+    return Image.frombytes(mode, size, random.randbytes(size[0] * size[1] * len(mode)))
+
+
+def test_rounded_corners_match_previous_implementation():
+    cases = [
+        ((120, 80), [10, 20, 30, 0]),
+        ((64, 64), [32, 32, 32, 32]),
+        ((200, 50), [0, 0, 0, 0]),
+        ((33, 97), [5, 1, 16, 7]),
+    ]
+    for seed, (size, radii) in enumerate(cases):
+        for mode in ["RGBA", "RGB"]:
+            image = get_random_image(size, mode, seed)
+            expected = previous_round_image_corners(image, radii)
+
+            # ? Second call uses cached mask
+            for _ in range(2):
+                result = round_image_corners(image, radii)
+                assert result.mode == expected.mode
+                assert result.tobytes() == expected.tobytes()
+
+
+def test_circles_match_previous_implementation():
+    for seed, size in enumerate([(120, 80), (64, 64), (33, 97), (1, 5)]):
+        for mode in ["RGBA", "RGB"]:
+            image = get_random_image(size, mode, seed)
+            expected = previous_create_circle_image(image)
+
+            for _ in range(2):
+                result = create_circle_image(image)
+                assert result.mode == expected.mode
+                assert result.tobytes() == expected.tobytes()
+
+
+def test_cached_masks_are_not_modified_by_callers():
+    size, radii = (90, 60), (12, 0, 24, 6)
+    corners_mask = get_rounded_corners_mask(size, radii)
+    circle_mask = get_circle_mask(size)
+    corners_mask_bytes = corners_mask.tobytes()
+    circle_mask_bytes = circle_mask.tobytes()
+
+    for seed in range(3):
+        image = get_random_image(size, "RGBA", seed)
+        round_image_corners(image, list(radii)).putalpha(0)
+        create_circle_image(image).putalpha(0)
+
+    assert get_rounded_corners_mask(size, radii) is corners_mask
+    assert get_circle_mask(size) is circle_mask
+    assert corners_mask.tobytes() == corners_mask_bytes
+    assert circle_mask.tobytes() == circle_mask_bytes
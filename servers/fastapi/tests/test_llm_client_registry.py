@@ -0,0 +1,19 @@
+import asyncio
+
+from api.services.llm_client_registry import LLMClientRegistry
+
+
+def test_openai_client_is_reused_until_api_key_changes(monkeypatch):
+    registry = LLMClientRegistry()
+    monkeypatch.setenv("OPENAI_API_KEY", "first")
+    client = registry.get_openai_client()
+    assert registry.get_openai_client() is client
+    assert client.api_key == "first"
+
+    # ? Image requests share connection pool of chat models
+    assert client._client is registry.get_http_clients()[1]
+
+    monkeypatch.setenv("OPENAI_API_KEY", "second")
+    assert registry.get_openai_client().api_key == "second"
+    assert registry.stats == {"clients": 1, "created": 2, "reused": 1}
+    asyncio.run(registry.aclose())
@@ -0,0 +1,110 @@
+import asyncio
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from api.services.llm_coalescer import LLMRequestCoalescer, get_llm_request_key
+
+
+def test_request_key_depends_on_messages_model_and_schema():
+    model = FakeListChatModel(responses=["a"])
+    messages = [SystemMessage("system"), HumanMessage("prompt")]
+
+    key = get_llm_request_key(model, messages)
+    assert key == get_llm_request_key(
+        model, [SystemMessage("system"), HumanMessage("prompt")]
+    )
+    assert key != get_llm_request_key(model, [messages[0], HumanMessage("other")])
+    assert key != get_llm_request_key(model, messages, {"type": "object"})
+    assert key != get_llm_request_key(FakeListChatModel(responses=["b"]), messages)
+
+
+def test_identical_requests_share_one_call():
+    coalescer = LLMRequestCoalescer()
+    calls = []
+
+    async def get_response(value):
+        calls.append(value)
+        await asyncio.sleep(0.01)
+        return {"value": value}
+
+    async def run():
+        return await asyncio.gather(
+            coalescer.run("a", lambda: get_response(1)),
+            coalescer.run("a", lambda: get_response(2)),
+            coalescer.run("b", lambda: get_response(3)),
+        )
+
+    responses = asyncio.run(run())
+
+    assert calls == [1, 3]
+    assert responses == [{"value": 1}, {"value": 1}, {"value": 3}]
+    assert responses[0] is not responses[1]
+    assert coalescer.stats == {"in_flight": 0, "started": 2, "coalesced": 1}
+
+
+def test_callers_can_not_change_shared_response():
+    coalescer = LLMRequestCoalescer()
+
+    async def get_response():
+        await asyncio.sleep(0.01)
+        return {"slides": ["a"]}
+
+    async def run_and_change():
+        response = await coalescer.run("a", get_response)
+        response["slides"].append("changed")
+        return response
+
+    async def run():
+        # ? First caller resumes and changes its response before the second one
+        return await asyncio.gather(run_and_change(), coalescer.run("a", get_response))
+
+    changed, response = asyncio.run(run())
+    assert changed == {"slides": ["a", "changed"]}
+    assert response == {"slides": ["a"]}
+
+
+def test_streams_fan_out_to_every_subscriber():
+    coalescer = LLMRequestCoalescer()
+    calls = []
+
+    async def get_stream():
+        calls.append(1)
+        for each in "abcd":
+            await asyncio.sleep(0.01)
+            yield each
+
+    async def consume(delay: float):
+        await asyncio.sleep(delay)
+        return "".join([each async for each in coalescer.stream("a", get_stream)])
+
+    async def run():
+        # ? Second subscriber joins after some chunks have been streamed
+        return await asyncio.gather(consume(0), consume(0.025))
+
+    assert asyncio.run(run()) == ["abcd", "abcd"]
+    assert len(calls) == 1
+    assert coalescer.stats["in_flight"] == 0
+
+
+def test_stream_errors_reach_every_subscriber():
+    coalescer = LLMRequestCoalescer()
+
+    async def get_stream():
+        yield "a"
+        await asyncio.sleep(0.01)
+        raise ValueError("Provider error")
+
+    async def consume():
+        chunks = []
+        try:
+            async for each in coalescer.stream("a", get_stream):
+                chunks.append(each)
+        except ValueError:
+            chunks.append("error")
+        return chunks
+
+    async def run():
+        return await asyncio.gather(consume(), consume())
+
+    assert asyncio.run(run()) == [["a", "error"], ["a", "error"]]
@@ -0,0 +1,94 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+from sqlmodel import SQLModel
+
+from api.services.database import get_sql_session, sql_engine
+from api.services.llm_response_cache import (
+    LLMResponseCacheService,
+    llm_response_cache_bypass,
+)
+from api.sql_models import LLMResponseCacheSqlModel
+from ppt_generator.models.other_models import SlideTypeModel
+
+SQLModel.metadata.create_all(sql_engine)
+
+
+def get_response_getter(calls: list):
+    async def get_response():
+        calls.append(1)
+        return SlideTypeModel(slide_type=len(calls))
+
+    return get_response
+
+
+def test_reuses_stored_responses():
+    cache = LLMResponseCacheService(True, 1, 64)
+    key = str(uuid.uuid4())
+    calls = []
+
+    first = asyncio.run(cache.run(key, SlideTypeModel, get_response_getter(calls)))
+    second = asyncio.run(cache.run(key, SlideTypeModel, get_response_getter(calls)))
+
+    assert first == second == SlideTypeModel(slide_type=1)
+    assert len(calls) == 1
+    assert cache.stats["hits"] == 1
+    assert cache.stats["misses"] == 1
+
+
+def test_bypass_refreshes_stored_response():
+    cache = LLMResponseCacheService(True, 1, 64)
+    key = str(uuid.uuid4())
+    calls = []
+
+    asyncio.run(cache.run(key, SlideTypeModel, get_response_getter(calls)))
+
+    async def run_bypassed():
+        llm_response_cache_bypass.set(True)
+        return await cache.run(key, SlideTypeModel, get_response_getter(calls))
+
+    assert asyncio.run(run_bypassed()) == SlideTypeModel(slide_type=2)
+    assert cache.stats["bypassed"] == 1
+    assert asyncio.run(
+        cache.run(key, SlideTypeModel, get_response_getter(calls))
+    ) == SlideTypeModel(slide_type=2)
+
+
+def test_expired_responses_are_not_reused():
+    cache = LLMResponseCacheService(True, 1, 64)
+    key = str(uuid.uuid4())
+    calls = []
+
+    asyncio.run(cache.run(key, SlideTypeModel, get_response_getter(calls)))
+    with get_sql_session() as sql_session:
+        cached = sql_session.get(LLMResponseCacheSqlModel, key)
+        cached.created_at = datetime.now() - timedelta(hours=2)
+        sql_session.commit()
+
+    asyncio.run(cache.run(key, SlideTypeModel, get_response_getter(calls)))
+    assert len(calls) == 2
+
+
+def test_evicts_least_recently_used_responses():
+    # ? Fits only a few responses of about 20 bytes
+    cache = LLMResponseCacheService(True, 1, 60 / (1024 * 1024))
+    keys = [str(uuid.uuid4()) for _ in range(5)]
+
+    for each in keys:
+        asyncio.run(cache.run(each, SlideTypeModel, get_response_getter([])))
+
+    with get_sql_session() as sql_session:
+        stored = [
+            each for each in keys if sql_session.get(LLMResponseCacheSqlModel, each)
+        ]
+    assert stored == keys[-3:]
+
+
+def test_disabled_cache_calls_every_time():
+    cache = LLMResponseCacheService(False, 1, 64)
+    calls = []
+
+    for _ in range(2):
+        asyncio.run(cache.run("key", SlideTypeModel, get_response_getter(calls)))
+    assert len(calls) == 2
@@ -0,0 +1,142 @@
+import asyncio
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.runnables import RunnableLambda
+
+from api.services.llm_scheduler import LLMPriority, LLMScheduler, get_lane_name
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+class FakeProvider:
+
+    def __init__(self, failures: int = 0, delay: float = 0.01):
+        self.failures = failures
+        self.delay = delay
+        self.running = 0
+        self.max_running = 0
+        self.calls = []
+
+    async def __call__(self, input):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(self.delay)
+            self.calls.append(input)
+            if self.failures:
+                self.failures -= 1
+                raise RateLimitError("Too many requests")
+            return f"response to {input}"
+        finally:
+            self.running -= 1
+
+
+model = FakeListChatModel(responses=["a", "b"])
+
+
+def test_retries_rate_limited_requests():
+    provider = FakeProvider(failures=2)
+    scheduler = LLMScheduler(max_retries=3, retry_base_delay=0.01)
+
+    response = asyncio.run(
+        scheduler.ainvoke(RunnableLambda(provider), "prompt", model)
+    )
+
+    assert response == "response to prompt"
+    assert len(provider.calls) == 3
+    stats = scheduler.stats[get_lane_name(model)]
+    assert stats["retries"] == 2
+    assert stats["completed"] == 1
+    assert stats["running"] == 0
+
+
+def test_gives_up_after_max_retries_and_on_other_errors():
+    scheduler = LLMScheduler(max_retries=1, retry_base_delay=0.01)
+
+    with pytest.raises(RateLimitError):
+        asyncio.run(
+            scheduler.ainvoke(RunnableLambda(FakeProvider(failures=5)), "p", model)
+        )
+
+    async def fail(input):
+        raise ValueError("Invalid request")
+
+    with pytest.raises(ValueError):
+        asyncio.run(scheduler.ainvoke(RunnableLambda(fail), "p", model))
+
+    stats = scheduler.stats[get_lane_name(model)]
+    assert stats["failed"] == 2
+    assert stats["retries"] == 1
+    assert stats["running"] == 0
+
+
+def test_limits_concurrency_and_serves_interactive_first():
+    provider = FakeProvider()
+    scheduler = LLMScheduler(max_concurrency=2)
+    runnable = RunnableLambda(provider)
+
+    async def run():
+        batch = [
+            asyncio.create_task(scheduler.ainvoke(runnable, f"batch {i}", model))
+            for i in range(6)
+        ]
+        await asyncio.sleep(0)
+        assert scheduler.stats[get_lane_name(model)]["queued"] == 4
+
+        interactive = asyncio.create_task(
+            scheduler.ainvoke(runnable, "edit", model, LLMPriority.INTERACTIVE)
+        )
+        await asyncio.gather(*batch, interactive)
+
+    asyncio.run(run())
+
+    assert provider.max_running == 2
+    # ? Edit is served as soon as the first slot is released
+    assert provider.calls.index("edit") == 2
+    stats = scheduler.stats[get_lane_name(model)]
+    assert stats["completed"] == 7
+    assert stats["queued"] == 0
+    assert stats["max_wait_time"] > 0
+
+
+def test_limits_requests_per_minute():
+    # ? 600 requests per minute are refilled every 0.1 seconds
+    scheduler = LLMScheduler(requests_per_minute=600)
+    runnable = RunnableLambda(FakeProvider(delay=0))
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        started_at = loop.time()
+        await asyncio.gather(
+            *[scheduler.ainvoke(runnable, i, model) for i in range(602)]
+        )
+        return loop.time() - started_at
+
+    assert asyncio.run(run()) >= 0.15
+
+
+def test_retries_streams_that_fail_before_first_chunk():
+    scheduler = LLMScheduler(max_retries=2, retry_base_delay=0.01)
+    attempts = []
+
+    async def stream(input):
+        attempts.append(input)
+        if len(attempts) == 1:
+            raise RateLimitError("Too many requests")
+        for each in ["a", "b", "c"]:
+            yield each
+
+    async def run():
+        return [
+            each
+            async for each in scheduler.astream(
+                RunnableLambda(stream), "prompt", model
+            )
+        ]
+
+    assert "".join(asyncio.run(run())) == "abc"
+    assert len(attempts) == 2
+    assert scheduler.stats[get_lane_name(model)]["running"] == 0
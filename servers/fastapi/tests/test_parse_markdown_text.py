@@ -0,0 +1,127 @@
+import random
+
+from ppt_generator.models.pptx_models import (
+    PptxFontModel,
+    PptxPresentationModel,
+    PptxTextRunModel,
+)
+from ppt_generator.pptx_presentation_creator import PptxPresentationCreator
+
+
+class LoopDetected(Exception):
+    pass
+
+
+def parse_markdown_text_to_text_runs_by_scanning(font: PptxFontModel, text: str):
+    text_runs = []
+    for line in text.split("\n"):
+        current_pos = 0
+        while current_pos < len(line):
+            previous_pos = current_pos
+            if (
+                line[current_pos:].startswith("***")
+                and "***" in line[current_pos + 3 :]
+            ):
+                end_pos = line.find("***", current_pos + 3)
+                font_json = font.model_dump()
+                font_json["bold"] = True
+                font_json["italic"] = True
+                text_runs.append(
+                    PptxTextRunModel(
+                        text=line[current_pos + 3 : end_pos],
+                        font=PptxFontModel(**font_json),
+                    )
+                )
+                current_pos = end_pos + 3
+            elif (
+                line[current_pos:].startswith("**") and "**" in line[current_pos + 2 :]
+            ):
+                end_pos = line.find("**", current_pos + 2)
+                font_json = font.model_dump()
+                font_json["bold"] = True
+                text_runs.append(
+                    PptxTextRunModel(
+                        text=line[current_pos + 2 : end_pos],
+                        font=PptxFontModel(**font_json),
+                    )
+                )
+                current_pos = end_pos + 2
+            elif (
+                line[current_pos:].startswith("__") and "__" in line[current_pos + 2 :]
+            ):
+                end_pos = line.find("__", current_pos + 2)
+                font_json = font.model_dump()
+                font_json["italic"] = True
+                text_runs.append(
+                    PptxTextRunModel(
+                        text=line[current_pos + 2 : end_pos],
+                        font=PptxFontModel(**font_json),
+                    )
+                )
+                current_pos = end_pos + 2
+            else:
+                next_marker = float("inf")
+                for marker in ["***", "**", "__"]:
+                    pos = line.find(marker, current_pos)
+                    if pos != -1:
+                        next_marker = min(next_marker, pos)
+
+                end_pos = next_marker if next_marker != float("inf") else len(line)
+                text_content = line[current_pos:end_pos]
+                if text_content:
+                    text_runs.append(PptxTextRunModel(text=text_content, font=font))
+                current_pos = end_pos
+
+            # ? Unclosed markers never moved the scanning parser forward
+            if current_pos == previous_pos:
+                raise LoopDetected()
+
+        if line != text.split("\n")[-1]:
+            text_runs.append(PptxTextRunModel(text="\n"))
+
+    return text_runs
+
+
+def get_creator():
+    return PptxPresentationCreator(
+        PptxPresentationModel(background_color="ffffff", slides=[]), "."
+    )
+
+
+def dump(text_runs):
+    return [each.model_dump() for each in text_runs]
+
+
+def test_tokenizer_matches_scanning_parser():
+    random.seed(0)
+    font = PptxFontModel(name="Inter", size=18, color="123456")
+    creator = get_creator()
+
+    compared = 0
+    for _ in range(5000):
+        text = "".join(
+            random.choice(["*", "**", "***", "_", "__", "a", "b c", " ", "\n"])
+            for _ in range(random.randint(0, 20))
+        )
+        try:
+            expected = parse_markdown_text_to_text_runs_by_scanning(font, text)
+        except LoopDetected:
+            continue
+
+        assert dump(creator.parse_markdown_text_to_text_runs(font, text)) == dump(
+            expected
+        ), text
+        compared += 1
+
+    assert compared > 1000
+
+
+def test_unclosed_markers_are_plain_text():
+    font = PptxFontModel()
+    text_runs = get_creator().parse_markdown_text_to_text_runs(font, "a ** b __c__ _")
+
+    assert [(each.text, each.font.bold, each.font.italic) for each in text_runs] == [
+        ("a ** b ", False, False),
+        ("c", False, True),
+        (" _", False, False),
+    ]
@@ -0,0 +1,38 @@
+import pdfplumber
+from langchain_community.document_loaders import PDFPlumberLoader
+
+from document_processor.loader import iter_pdf_pages_text, load_pdf_document
+
+PDF_PATH = "tests/assets/impact_of_llms.pdf"
+
+
+def test_matches_pdfplumber_loader():
+    expected = PDFPlumberLoader(PDF_PATH).load()
+
+    documents = load_pdf_document(PDF_PATH)
+
+    assert len(documents) == 1
+    assert documents[0].page_content == "".join(
+        each.page_content for each in expected
+    )
+    assert documents[0].metadata == expected[0].metadata
+    assert documents[0].page_content.startswith("The Impact of Large Language Models")
+
+
+def test_stops_at_page_and_character_limits(monkeypatch):
+    expected = PDFPlumberLoader(PDF_PATH).load()
+
+    monkeypatch.setenv("DOCUMENT_PDF_MAX_PAGES", "1")
+    document = load_pdf_document(PDF_PATH)[0]
+    assert document.page_content == expected[0].page_content
+    assert document.metadata["total_pages"] == 2
+
+    with pdfplumber.open(PDF_PATH) as pdf:
+        assert "".join(iter_pdf_pages_text(pdf, max_chars=100)) == (
+            expected[0].page_content[:100]
+        )
+
+
+def test_reads_limits_from_environment(monkeypatch):
+    monkeypatch.setenv("DOCUMENT_PDF_MAX_CHARS", "50")
+    assert len(load_pdf_document(PDF_PATH)[0].page_content) == 50
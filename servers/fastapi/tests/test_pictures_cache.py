@@ -0,0 +1,62 @@
+import os
+import shutil
+
+from PIL import Image
+
+from api.services.file_cache import FileCacheService
+from ppt_generator.models.pptx_models import (
+    PptxPictureBoxModel,
+    PptxPictureModel,
+    PptxPositionModel,
+    PptxPresentationModel,
+    PptxSlideModel,
+)
+from ppt_generator.pptx_presentation_creator import PptxPresentationCreator
+
+
+def get_creator(tmp_path, pictures_cache: FileCacheService):
+    image_path = str(tmp_path / "picture.png")
+    if not os.path.exists(image_path):
+        Image.new("RGB", (200, 100), "red").save(image_path)
+
+    temp_dir = tmp_path / "export"
+    temp_dir.mkdir(exist_ok=True)
+    picture_model = PptxPictureBoxModel(
+        position=PptxPositionModel(width=100, height=100),
+        picture=PptxPictureModel(is_network=False, path=image_path),
+    )
+    ppt_model = PptxPresentationModel(
+        background_color="ffffff",
+        slides=[PptxSlideModel(shapes=[picture_model])],
+    )
+    creator = PptxPresentationCreator(
+        ppt_model, str(temp_dir), pictures_cache=pictures_cache
+    )
+    return creator, picture_model
+
+
+def test_cached_pictures_survive_eviction(tmp_path):
+    pictures_cache = FileCacheService(str(tmp_path / "cache"), 64)
+    creator, picture_model = get_creator(tmp_path, pictures_cache)
+    creator.transform_pictures(creator._slide_models)
+
+    creator, picture_model = get_creator(tmp_path, pictures_cache)
+    creator.transform_pictures(creator._slide_models)
+    assert pictures_cache.stats["hits"] == 1
+
+    # ? Another export evicts the picture before it is embedded
+    shutil.rmtree(tmp_path / "cache")
+    image_path = creator.get_transformed_picture(picture_model)
+    assert image_path.startswith(str(tmp_path / "export"))
+    assert os.path.exists(image_path)
+
+
+def test_evicted_pictures_are_transformed_again(tmp_path, monkeypatch):
+    pictures_cache = FileCacheService(str(tmp_path / "cache"), 64)
+    monkeypatch.setattr(
+        pictures_cache, "get", lambda _: str(tmp_path / "cache" / "missing.png")
+    )
+    creator, picture_model = get_creator(tmp_path, pictures_cache)
+    creator.transform_pictures(creator._slide_models)
+
+    assert os.path.exists(creator.get_transformed_picture(picture_model))
@@ -0,0 +1,54 @@
+import asyncio
+import multiprocessing
+import os
+
+import pytest
+
+from api.services.process_pool import ProcessPoolService, ProcessPoolTaskError
+
+
+def exit_in_worker(value: int) -> int:
+    # ? Simulates a worker killed while processing, e.g. by running out of memory
+    if multiprocessing.parent_process() is not None:
+        os._exit(1)
+    return value
+
+
+def get_pid(_) -> int:
+    return os.getpid()
+
+
+def test_runs_in_process_until_started():
+    pool = ProcessPoolService(2)
+
+    assert pool.map(get_pid, [1, 2]) == [os.getpid()] * 2
+    assert pool.stats["started"] is False
+
+
+def test_recovers_from_broken_pool():
+    pool = ProcessPoolService(2)
+    pool.start()
+    try:
+        assert os.getpid() not in pool.map(get_pid, [1, 2])
+
+        # ? Tasks crashing their worker are retried once in a new worker, but
+        # ? never in the server process
+        assert pool.map(exit_in_worker, [1, 2], crashed_result=0) == [0, 0]
+        assert pool.stats["restarts"] >= 2
+        assert pool.stats["crashes"] == 2
+
+        # ? Later tasks run in workers of the new pool
+        assert os.getpid() not in pool.map(get_pid, [1, 2])
+    finally:
+        pool.shutdown()
+
+
+def test_async_run_recovers_from_broken_pool():
+    pool = ProcessPoolService(2)
+    pool.start()
+    try:
+        with pytest.raises(ProcessPoolTaskError):
+            asyncio.run(pool.run(exit_in_worker, 3))
+        assert asyncio.run(pool.run(get_pid, 1)) != os.getpid()
+    finally:
+        pool.shutdown()
@@ -0,0 +1,104 @@
+from io import BytesIO
+import zipfile
+
+from PIL import Image
+from pptx import Presentation
+from pptx.util import Pt
+
+from api.services.file_cache import FileCacheService
+from ppt_generator.models.pptx_models import (
+    PptxFontModel,
+    PptxParagraphModel,
+    PptxPictureBoxModel,
+    PptxPictureModel,
+    PptxPositionModel,
+    PptxPresentationModel,
+    PptxSlideModel,
+    PptxTextBoxModel,
+)
+from ppt_generator.pptx_presentation_creator import PptxPresentationCreator
+
+
+def create_pptx(tmp_path, slides_cache: FileCacheService):
+    image_path = str(tmp_path / "picture.png")
+    Image.new("RGB", (40, 20), "blue").save(image_path)
+
+    slide_model = PptxSlideModel(
+        shapes=[
+            PptxTextBoxModel(
+                position=PptxPositionModel(left=10, top=10, width=300, height=50),
+                paragraphs=[
+                    PptxParagraphModel(
+                        text="Cached **slide**", font=PptxFontModel(size=16)
+                    )
+                ],
+            ),
+            PptxPictureBoxModel(
+                position=PptxPositionModel(left=10, top=100, width=40, height=20),
+                clip=False,
+                picture=PptxPictureModel(is_network=False, path=image_path),
+            ),
+        ]
+    )
+    creator = PptxPresentationCreator(
+        PptxPresentationModel(background_color="ffffff", slides=[slide_model]),
+        str(tmp_path),
+        slides_cache=slides_cache,
+    )
+    creator.create_ppt()
+    return creator
+
+
+def get_shapes(file):
+    return [
+        (shape.shape_type, shape.name, shape.has_text_frame and shape.text_frame.text)
+        for shape in Presentation(file).slides[0].shapes
+    ]
+
+
+def test_cached_slides_match_created_slides(tmp_path):
+    slides_cache = FileCacheService(str(tmp_path / "slides"), 64)
+
+    created = BytesIO()
+    create_pptx(tmp_path, slides_cache).save(created)
+    cached = BytesIO()
+    creator = create_pptx(tmp_path, slides_cache)
+    creator.save(cached)
+
+    assert slides_cache.stats["hits"] == 1
+    assert get_shapes(cached) == get_shapes(created)
+
+
+def test_cached_slides_can_still_be_edited(tmp_path):
+    slides_cache = FileCacheService(str(tmp_path / "slides"), 64)
+    create_pptx(tmp_path, slides_cache)
+    creator = create_pptx(tmp_path, slides_cache)
+
+    # ? Shapes of spliced slide must edit the tree that is saved
+    slide = creator._ppt.slides[0]
+    assert len(slide.shapes) == 2
+    slide.shapes.add_textbox(0, 0, Pt(10), Pt(10)).text_frame.text = "Added"
+
+    saved = BytesIO()
+    creator.save(saved)
+    assert get_shapes(saved)[-1][2] == "Added"
+    assert len(get_shapes(saved)) == 3
+
+
+def test_compressed_package_stores_media(tmp_path):
+    slides_cache = FileCacheService(str(tmp_path / "slides"), 64)
+    default = BytesIO()
+    create_pptx(tmp_path, slides_cache).save(default)
+    compressed = BytesIO()
+    create_pptx(tmp_path, slides_cache).save(compressed, 9)
+
+    with zipfile.ZipFile(default) as default_zip, zipfile.ZipFile(
+        compressed
+    ) as compressed_zip:
+        assert compressed_zip.namelist() == default_zip.namelist()
+        for each in compressed_zip.infolist():
+            is_media = each.filename.startswith("ppt/media/")
+            assert each.compress_type == (
+                zipfile.ZIP_STORED if is_media else zipfile.ZIP_DEFLATED
+            )
+    assert get_shapes(compressed) == get_shapes(default)
@@ -0,0 +1,61 @@
+import json
+
+from ppt_generator.slides_stream_parser import SlidesStreamParser
+
+
+presentation = {
+    "title": 'Presentation about "slides" [1]',
+    "n_slides": 3,
+    "titles": ["Introduction", "Details {1}", "Conclusion"],
+    "slides": [
+        {
+            "type": 1,
+            "content": {
+                "title": "Introduction",
+                "body": 'Escaped \\"quotes\\" and }] brackets',
+                "image_prompts": ["a sunrise"],
+            },
+        },
+        {
+            "type": 2,
+            "content": {
+                "title": "Details",
+                "body": [{"heading": "One", "description": "First item"}],
+            },
+        },
+        {
+            "type": 7,
+            "content": {
+                "title": "Conclusion",
+                "body": [{"heading": "Two", "description": "Second item"}],
+                "icon_queries": [{"queries": ["bulb", "light", "lamp"]}],
+            },
+        },
+    ],
+}
+
+
+def test_slides_are_parsed_while_streaming():
+    text = f"```json\n{json.dumps(presentation, indent=2)}\n```"
+
+    parser = SlidesStreamParser()
+    parsed = []
+    streamed_length_on_parse = []
+    for i in range(0, len(text), 5):
+        for each in parser.feed(text[i : i + 5]):
+            parsed.append(each)
+            streamed_length_on_parse.append(i + 5)
+
+    assert [index for index, _ in parsed] == [0, 1, 2]
+    assert [slide for _, slide in parsed] == presentation["slides"]
+    assert streamed_length_on_parse[0] < text.index('"Details"', text.index("slides"))
+    assert parser.text == text
+
+
+def test_invalid_slide_keeps_following_indexes():
+    text = '{"slides": [{"type": 1, "content": {,}}, {"type": 2}]}'
+
+    parser = SlidesStreamParser()
+    parsed = parser.feed(text)
+
+    assert parsed == [(1, {"type": 2})]
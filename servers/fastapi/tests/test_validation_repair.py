@@ -0,0 +1,112 @@
+import asyncio
+
+from fastapi import HTTPException
+import pytest
+
+from ppt_config_generator.models import PresentationMarkdownModel
+from ppt_generator.models.llm_models import (
+    LLMType2Content,
+    LLMType5Content,
+    LLMType7Content,
+)
+from ppt_generator.models.other_models import SlideTypeModel
+from ppt_generator import fix_validation_errors
+from ppt_generator.fix_validation_errors import get_validated_response, validation_fixes
+from ppt_generator.validation_repair import repair_response, truncate_at_word_boundary
+
+DESCRIPTION = "Revenue grew steadily across every region " * 3
+
+
+def test_truncates_at_word_boundary():
+    assert truncate_at_word_boundary("short text", 20) == "short text"
+    assert truncate_at_word_boundary("one two three, four", 15) == "one two three"
+    assert truncate_at_word_boundary("a" * 30, 10) == "a" * 10
+
+
+def test_repairs_lengths_of_strings_and_lists():
+    response = {
+        "title": "Growth",
+        "body": [
+            {"heading": "Revenue growth in all regions", "description": DESCRIPTION * 2}
+            for _ in range(6)
+        ],
+    }
+
+    repaired = repair_response(LLMType2Content, response)
+
+    assert len(repaired.body) == 4
+    assert len(repaired.body[0].description) <= 180
+    assert (DESCRIPTION * 2).startswith(repaired.body[0].description + " ")
+    # ? Original response is not modified
+    assert len(response["body"]) == 6
+
+
+def test_renames_misnamed_keys_and_coerces_values():
+    response = {
+        "Title": "Icons",
+        "body": {"heading": "Speed", "desciption": DESCRIPTION},
+        "icon_queries": [{"query": ["rocket", "fast", "speed"]}],
+    }
+
+    repaired = repair_response(LLMType7Content, response)
+
+    assert repaired.title == "Icons"
+    assert repaired.body[0].description == DESCRIPTION
+    assert repaired.icon_queries[0].queries == ["rocket", "fast", "speed"]
+
+    repaired = repair_response(
+        PresentationMarkdownModel,
+        {"title": ["Deck"], "notes": "Use blue", "slides": []},
+    )
+    assert repaired.title == "Deck"
+    assert repaired.notes == ["Use blue"]
+
+    assert repair_response(SlideTypeModel, {"slide_type": "Type 4"}).slide_type == 4
+
+
+def test_gives_up_on_errors_it_can_not_repair():
+    # ? Too short description can only be fixed by LLM
+    response = {
+        "title": "Growth",
+        "body": [{"heading": "Revenue", "description": "Too short"}],
+    }
+    assert repair_response(LLMType2Content, response) is None
+    assert repair_response(LLMType2Content, None) is None
+
+    # ? Ambiguous union members of graphs are not guessed
+    response = {"title": "Graph", "body": DESCRIPTION, "graph": {"name": "Sales"}}
+    assert repair_response(LLMType5Content, response) is None
+
+
+def get_validated_response_with_fix(fixed_response, monkeypatch):
+    # ? Too short description can only be fixed by LLM
+    invalid_response = {
+        "title": "Growth",
+        "body": [{"heading": "Revenue", "description": "Too short"}],
+    }
+    responses = iter([invalid_response, fixed_response])
+
+    async def get_response(*args, **kwargs):
+        return next(responses)
+
+    monkeypatch.setattr(fix_validation_errors.llm_scheduler, "ainvoke", get_response)
+    monkeypatch.setattr(fix_validation_errors, "fix_validation_errors", get_response)
+    return asyncio.run(get_validated_response(None, {}, LLMType2Content, None))
+
+
+def test_counts_llm_fixes_only_when_they_validate(monkeypatch):
+    monkeypatch.setitem(validation_fixes, "llm", 0)
+    monkeypatch.setitem(validation_fixes, "failed", 0)
+
+    with pytest.raises(HTTPException):
+        get_validated_response_with_fix(
+            {"title": "Growth", "body": [{"heading": "Revenue"}]}, monkeypatch
+        )
+    assert validation_fixes == {**validation_fixes, "llm": 0, "failed": 1}
+
+    fixed_response = {
+        "title": "Growth",
+        "body": [{"heading": "Revenue", "description": DESCRIPTION}] * 2,
+    }
+    assert get_validated_response_with_fix(fixed_response, monkeypatch)
+    assert validation_fixes == {**validation_fixes, "llm": 1, "failed": 1}